@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Time importing configmate, compared with importing the dependencies it defers until they are used
+
+Each import runs in a new interpreter, and the fastest of several runs is reported.
+
+Usage: python benchmarks/bench_import.py [RUN_COUNT]
+"""
+
+from __future__ import print_function, unicode_literals
+import os
+import subprocess
+import sys
+
+
+DEFAULT_RUN_COUNT = 5
+MODULE_LIST = ['configmate', 'yaml', 'multiprocessing', 'json']
+
+IMPORT_SCRIPT = '''
+import time
+
+start_time = time.time()
+import {}
+print(time.time() - start_time)
+'''
+
+
+def time_import(module_name):
+    """
+    Return the time to import a module in a new interpreter, in seconds
+    """
+
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output([sys.executable, '-c', IMPORT_SCRIPT.format(module_name)], cwd = package_dir)
+    return float(output.decode('utf-8'))
+
+
+def main():
+    run_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RUN_COUNT
+    for module_name in MODULE_LIST:
+        import_time = min(time_import(module_name) for _ in range(run_count))
+        print('{:<16} {:.1f}ms'.format(module_name, import_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
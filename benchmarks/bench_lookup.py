@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the time to look up plain, expression, frozen and nested config values with a dict lookup
+
+Usage: python benchmarks/bench_lookup.py [LOOKUP_COUNT]
+"""
+
+from __future__ import print_function, unicode_literals
+import sys
+import timeit
+from configmate import Config, compile_path
+
+
+DEFAULT_LOOKUP_COUNT = 1000000
+REPEAT_COUNT = 5
+
+CONFIG_STRING = '''
+name: world
+plain: hello world
+expression: hello ${name}
+db:
+  pool:
+    size: 10
+'''
+
+
+def main():
+    lookup_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LOOKUP_COUNT
+
+    config = Config(from_string = CONFIG_STRING)
+    config_dict = dict(config)
+    frozen_config = config.freeze()
+    size_path = compile_path('db.pool.size')
+
+    for description, lookup in (
+        ('dict', lambda: config_dict['plain']),
+        ('plain', lambda: config['plain']),
+        ('expression', lambda: config['expression']),
+        ('frozen', lambda: frozen_config['expression']),
+        ('nested', lambda: config['db']['pool']['size']),
+        ('path', lambda: config.get_path('db.pool.size')),
+        ('compiled', lambda: config.get_path(size_path)),
+    ):
+        lookup_time = min(timeit.repeat(lookup, number = lookup_count, repeat = REPEAT_COUNT))
+        print('{:<12} {:.0f}ns'.format(description, lookup_time / lookup_count * 1e9))
+
+
+if __name__ == '__main__':
+    main()
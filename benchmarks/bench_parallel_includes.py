@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the time to load a config with many includes serially and on a thread pool, with added file read latency
+
+Usage: python benchmarks/bench_parallel_includes.py [INCLUDE_COUNT [LATENCY_MS]]
+"""
+
+from __future__ import print_function, unicode_literals
+import os
+import sys
+from shutil import rmtree
+from tempfile import mkdtemp
+import time
+import timeit
+from configmate import Config
+from configmate.file_utils import read_yaml_file, read_yaml_string, register_parser_backend
+
+
+DEFAULT_INCLUDE_COUNT = 40
+DEFAULT_LATENCY_MS = 5
+MAX_WORKERS_LIST = (None, 4, 16)
+REPEAT_COUNT = 3
+
+
+def main():
+    include_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_INCLUDE_COUNT
+    latency = float(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_LATENCY_MS) / 1000
+
+    def read_file_slowly(file_name, **kwargs):
+        time.sleep(latency)
+        return read_yaml_file(file_name, **kwargs)
+
+    register_parser_backend('slow', read_file_slowly, read_yaml_string, ['.slow'])
+
+    temp_dir_name = mkdtemp(prefix = 'configmate.benchmark')
+    try:
+        include_list = []
+        for index in range(include_count):
+            include_list.append('include{}.slow'.format(index))
+            with open(os.path.join(temp_dir_name, include_list[-1]), 'w') as file_object:
+                file_object.write('key{}: value {}\n'.format(index, index))
+
+        file_name = os.path.join(temp_dir_name, 'main.slow')
+        with open(file_name, 'w') as file_object:
+            file_object.write('include:\n{}\n'.format('\n'.join(['- ' + name for name in include_list])))
+
+        print('{} includes, {:.0f}ms latency'.format(include_count, latency * 1000))
+
+        for max_workers in MAX_WORKERS_LIST:
+            load_time = min(timeit.repeat(
+                lambda: Config(from_file = file_name, path_list = [temp_dir_name], max_workers = max_workers),
+                number = 1,
+                repeat = REPEAT_COUNT
+            ))
+            print('max_workers={:<5} {:.3f}s'.format(max_workers, load_time))
+
+    finally:
+        rmtree(temp_dir_name)
+
+
+if __name__ == '__main__':
+    main()
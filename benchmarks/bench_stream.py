@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the time and memory to load a config with a large list, with and without streaming the list
+
+Each load runs in a child process so the peak memory of each can be measured.
+
+Usage: python benchmarks/bench_stream.py [ITEM_COUNT]
+"""
+
+from __future__ import print_function, unicode_literals
+import os
+import resource
+import sys
+from shutil import rmtree
+from tempfile import mkdtemp
+import time
+from configmate import Config
+
+
+DEFAULT_ITEM_COUNT = 100000
+
+
+def load_config(file_name, stream_keys):
+    start_time = time.time()
+    config = Config(from_file = file_name, stream_keys = stream_keys)
+    load_time = time.time() - start_time
+
+    start_time = time.time()
+    item_count = sum(1 for _ in config['hosts'])
+    iterate_time = time.time() - start_time
+
+    # maximum resident set size, in KB on Linux
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print('{:<10} load {:.2f}s, iterate {} items {:.2f}s, max rss {:.0f}MB'.format(
+        'streamed' if stream_keys else 'full',
+        load_time,
+        item_count,
+        iterate_time,
+        max_rss / 1024.0
+    ))
+
+
+def main():
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITEM_COUNT
+
+    temp_dir_name = mkdtemp(prefix = 'configmate.benchmark')
+    try:
+        file_name = os.path.join(temp_dir_name, 'inventory.yml')
+        with open(file_name, 'w') as file_object:
+            file_object.write('name: inventory\nhosts:\n')
+            for index in range(item_count):
+                file_object.write('- name: host{}\n  port: {}\n  tags: [web, prod]\n'.format(index, 8000 + index % 100))
+
+        for stream_keys in (None, ['hosts']):
+            pid = os.fork()
+            if pid == 0:
+                load_config(file_name, stream_keys)
+                os._exit(0)
+
+            os.waitpid(pid, 0)
+
+    finally:
+        rmtree(temp_dir_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Time loading, merging and looking up synthetic configs, and compare the times with a stored baseline
+
+Each case is timed several times and the fastest time is used. The baseline for the Python version is read from
+benchmarks/baselines, and cases slower than the baseline by more than the threshold are reported as regressions.
+
+Usage: python benchmarks/bench_suite.py [--save] [--baseline FILE] [--threshold RATIO] [--depth N] [--fan-out N]
+           [--key-count N] [--nesting N] [--value-size N]
+"""
+
+from __future__ import print_function, unicode_literals
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+from shutil import rmtree
+from tempfile import mkdtemp
+import timeit
+from configmate import Config, FileDataCache
+from configmate.merge import ConfigMerger, MERGE_DEEP
+from synthetic import make_config_data, make_config_string, write_include_tree
+
+
+REPEAT_COUNT = 5
+DEFAULT_THRESHOLD = 0.25
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+
+def get_baseline_file_name():
+    return os.path.join(BASELINE_DIR, 'python{}.{}.json'.format(*sys.version_info[:2]))
+
+
+def time_case(function, number):
+    """
+    Return the fastest time for one call of a function, in seconds
+    """
+
+    return min(timeit.repeat(function, number = number, repeat = REPEAT_COUNT)) / number
+
+
+def run_cases(args, temp_dir_name):
+    """
+    Time each case
+
+    :return: list of tuples of case name and time per call in seconds
+    """
+
+    root_file_name, file_count = write_include_tree(
+        temp_dir_name,
+        args.depth,
+        args.fan_out,
+        args.key_count,
+        nesting = args.nesting,
+        value_size = args.value_size
+    )
+    path_list = [temp_dir_name]
+    print('{} files in include tree'.format(file_count))
+    config_string = make_config_string(args.key_count, args.nesting, args.value_size)
+
+    cache = FileDataCache(max_size = file_count)
+    Config(from_file = root_file_name, path_list = path_list, cache = cache)
+
+    merge_target = make_config_data(args.key_count, args.nesting, args.value_size)
+    merge_source = make_config_data(args.key_count, args.nesting, args.value_size)
+    merger = ConfigMerger(MERGE_DEEP)
+
+    def merge():
+        target = dict(merge_target)
+        merger.reset(target)
+        merger.merge(target, merge_source)
+
+    config = Config(from_string = config_string)
+    key_list = list(config)
+    nested_path = '.'.join(['key0'] * (args.nesting + 1))
+
+    def lookup():
+        for key in key_list:
+            config[key]
+
+    def lookup_path():
+        config.get_path(nested_path)
+
+    lookup_number = max(1, 100000 // len(key_list))
+    return [
+        ('load_cold', time_case(lambda: Config(from_file = root_file_name, path_list = path_list), 3)),
+        ('load_warm', time_case(lambda: Config(from_file = root_file_name, path_list = path_list, cache = cache), 3)),
+        ('from_string', time_case(lambda: Config(from_string = config_string), 3)),
+        ('merge_deep', time_case(merge, 100)),
+        ('getitem', time_case(lookup, lookup_number) / len(key_list)),
+        ('get_path', time_case(lookup_path, 100000)),
+    ]
+
+
+def format_time(seconds):
+    if seconds >= 1:
+        return '{:.2f}s'.format(seconds)
+
+    if seconds >= 1e-3:
+        return '{:.2f}ms'.format(seconds * 1e3)
+
+    if seconds >= 1e-6:
+        return '{:.2f}us'.format(seconds * 1e6)
+
+    return '{:.0f}ns'.format(seconds * 1e9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Run the configmate benchmark suite')
+    parser.add_argument('--save', action = 'store_true', help = 'save the results as the baseline')
+    parser.add_argument('--baseline', default = get_baseline_file_name(), help = 'baseline file')
+    parser.add_argument(
+        '--threshold',
+        type = float,
+        default = DEFAULT_THRESHOLD,
+        help = 'slowdown ratio reported as a regression'
+    )
+    parser.add_argument('--depth', type = int, default = 3, help = 'include tree depth')
+    parser.add_argument('--fan-out', type = int, default = 3, help = 'includes in each file')
+    parser.add_argument('--key-count', type = int, default = 10, help = 'keys in each dict')
+    parser.add_argument('--nesting', type = int, default = 2, help = 'levels of nested dicts')
+    parser.add_argument('--value-size', type = int, default = 16, help = 'length of string values')
+    args = parser.parse_args()
+
+    parameter_map = {
+        'depth': args.depth,
+        'fan_out': args.fan_out,
+        'key_count': args.key_count,
+        'nesting': args.nesting,
+        'value_size': args.value_size,
+    }
+
+    baseline = None
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as file_object:
+            baseline = json.load(file_object)
+
+        if baseline['parameters'] != parameter_map:
+            print('Baseline parameters differ, not comparing: {}'.format(args.baseline))
+            baseline = None
+
+    temp_dir_name = mkdtemp(prefix = 'configmate.benchmark')
+    try:
+        result_list = run_cases(args, temp_dir_name)
+
+    finally:
+        rmtree(temp_dir_name)
+
+    regression_list = []
+    for name, seconds in result_list:
+        line = '{:<12} {:>10}'.format(name, format_time(seconds))
+        if baseline is not None and name in baseline['results']:
+            ratio = seconds / baseline['results'][name]
+            line += '  {:>5.2f}x baseline'.format(ratio)
+            if ratio > 1 + args.threshold:
+                line += '  REGRESSION'
+                regression_list.append(name)
+
+        print(line)
+
+    if args.save:
+        if not os.path.isdir(os.path.dirname(args.baseline)):
+            os.makedirs(os.path.dirname(args.baseline))
+
+        with open(args.baseline, 'w') as file_object:
+            json.dump(
+                {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'date': datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'parameters': parameter_map,
+                    'results': dict(result_list),
+                },
+                file_object,
+                indent = 2,
+                separators = (',', ': '),
+                sort_keys = True
+            )
+            file_object.write('\n')
+
+        print('Saved baseline: {}'.format(args.baseline))
+
+    return 1 if regression_list else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
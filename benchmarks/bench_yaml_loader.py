@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the time to load a large config file with each available YAML loader
+
+Usage: python benchmarks/bench_yaml_loader.py [KEY_COUNT]
+"""
+
+from __future__ import print_function, unicode_literals
+import os
+import sys
+from shutil import rmtree
+from tempfile import mkdtemp
+import timeit
+import yaml
+from configmate import Config
+from configmate.file_utils import get_yaml_loader_list
+
+
+DEFAULT_KEY_COUNT = 5000
+REPEAT_COUNT = 5
+
+
+def make_config_data(key_count):
+    return {
+        'key{}'.format(index): {
+            'name': 'value {}'.format(index),
+            'count': index,
+            'enabled': index % 2 == 0,
+            'tags': ['tag{}'.format(tag) for tag in range(5)],
+        }
+        for index in range(key_count)
+    }
+
+
+def main():
+    key_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_KEY_COUNT
+
+    temp_dir_name = mkdtemp(prefix = 'configmate.benchmark')
+    try:
+        file_name = os.path.join(temp_dir_name, 'large.yml')
+        with open(file_name, 'w') as file_object:
+            yaml.safe_dump(make_config_data(key_count), file_object, default_flow_style = False)
+
+        print('{} keys, {} bytes'.format(key_count, os.path.getsize(file_name)))
+
+        for yaml_loader in get_yaml_loader_list():
+            load_time = min(timeit.repeat(
+                lambda: Config(from_file = file_name, yaml_loader = yaml_loader),
+                number = 1,
+                repeat = REPEAT_COUNT
+            ))
+            print('{:<12} {:.3f}s'.format(yaml_loader.__name__, load_time))
+
+    finally:
+        rmtree(temp_dir_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Generate synthetic config data and include trees for the benchmarks
+"""
+
+from __future__ import print_function, unicode_literals
+import os
+import yaml
+
+
+def make_config_data(key_count, nesting = 0, value_size = 16, prefix = ''):
+    """
+    Return a dict of config data
+
+    :param key_count: number of keys in each dict
+    :param nesting: number of levels of nested dicts below the top level
+    :param value_size: length of the string values
+    :param prefix: prefix for the key names, so data from different files can overlap or not
+    """
+
+    config_data = {}
+    for index in range(key_count):
+        key = '{}key{}'.format(prefix, index)
+        if nesting > 0 and index % 2 == 0:
+            config_data[key] = make_config_data(key_count, nesting - 1, value_size)
+
+        elif index % 4 == 1:
+            config_data[key] = index
+
+        elif index % 4 == 3:
+            config_data[key] = ['item{}'.format(item) for item in range(4)]
+
+        else:
+            config_data[key] = ('value{}-'.format(index) * value_size)[:value_size]
+
+    return config_data
+
+
+def make_config_string(key_count, nesting = 0, value_size = 16):
+    """
+    Return config data as a YAML string
+    """
+
+    return yaml.safe_dump(make_config_data(key_count, nesting, value_size), default_flow_style = False)
+
+
+def write_include_tree(dir_name, depth, fan_out, key_count, nesting = 0, value_size = 16, overlap = True):
+    """
+    Write a tree of config files, where each file includes fan_out files down to the given depth
+
+    :param dir_name: directory to write the files in
+    :param depth: number of levels of includes below the root file
+    :param fan_out: number of files each file includes
+    :param overlap: if set every file uses the same keys, so values are merged, otherwise each file has its own keys
+    :return: tuple of the root file name and the number of files written
+    """
+
+    file_count = [0]
+
+    def write_node(level):
+        file_name = 'config{}.yml'.format(file_count[0])
+        file_count[0] += 1
+
+        config_data = make_config_data(key_count, nesting, value_size, prefix = '' if overlap else file_name[:-4])
+        if level < depth:
+            config_data['include'] = [write_node(level + 1) for _ in range(fan_out)]
+
+        with open(os.path.join(dir_name, file_name), 'w') as file_object:
+            yaml.safe_dump(config_data, file_object, default_flow_style = False)
+
+        return file_name
+
+    root_file_name = write_node(0)
+    return os.path.join(dir_name, root_file_name), file_count[0]
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 
 from .config import Config, ConfigException, ConfigLoadException, ConfigLoadFormatException  # noqa: F401
+from .file_utils import FileDataCache  # noqa: F401
+from .frozen import FrozenConfig, FrozenDict, FrozenList, freeze  # noqa: F401
+from .path import ConfigPath, compile_path  # noqa: F401
+from .schema import Field, Schema, parse_duration, parse_size  # noqa: F401
+from .shared import SharedConfig  # noqa: F401
+from .stats import LoadStats  # noqa: F401
+from .watch import ConfigWatcher  # noqa: F401
 
 __title__ = 'configmate'
 __version__ = '0.1.0'
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+import argparse
+import sys
+from .config import Config, ConfigException
+
+
+def compile_snapshot(argv = None):
+    """
+    Load a config file and write a snapshot of it to be loaded with Config.from_snapshot
+
+    :return: exit code
+    """
+
+    parser = argparse.ArgumentParser(description = 'Compile a config file and its includes into a snapshot file')
+    parser.add_argument('config_file', help = 'config file name')
+    parser.add_argument('snapshot_file', help = 'snapshot file name to write')
+    parser.add_argument(
+        '-p', '--path',
+        action = 'append',
+        dest = 'path_list',
+        help = 'config search path, can be given more than once'
+    )
+    parser.add_argument('-b', '--backend', help = 'parser backend name, otherwise chosen by file name extension')
+    args = parser.parse_args(argv)
+
+    try:
+        config = Config(from_file = args.config_file, path_list = args.path_list, backend = args.backend)
+        config.compile(args.snapshot_file)
+
+    except (ConfigException, IOError, OSError) as e:
+        print('Error: {}'.format(e), file = sys.stderr)
+        return 1
+
+    print('Compiled {} to {}'.format(config.sources, args.snapshot_file))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(compile_snapshot())
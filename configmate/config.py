@@ -1,10 +1,22 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import print_function, unicode_literals
+from contextlib import contextmanager
 from copy import deepcopy
+from functools import partial
 import os
-from .file_utils import read_yaml_file, read_yaml_string
+from .file_utils import get_file_id, get_parser_backend, get_path_names, FileDataCache, PathIndex, PARSER_BACKEND_YAML
+from .snapshot import read_snapshot, write_snapshot
+from .expression import compile_expression, get_references, is_expression, string_types
+from .generated import GeneratedValueStore
+from .merge import ConfigMerger, MERGE_REPLACE
+from .layers import LayeredConfig, LAYER_DEFAULTS_NAME
+from .frozen import freeze, FrozenConfig, FrozenDict
+from .path import get_path_value, NO_DEFAULT
+from .schema import Schema
+from .stats import get_timer, LoadStats, PHASE_LOAD, PHASE_MERGE, PHASE_PARSE, PHASE_READ, PHASE_RESOLVE, PHASE_VALIDATE
 from collections import MutableMapping
+import threading
 import logging
 
 
@@ -13,6 +25,7 @@ log = logging.getLogger('configmate.config')
 
 CONFIG_INCLUDE_KEY = 'include'
 CONFIG_INCLUDE_OPTIONAL_KEY = 'include_optional'
+ASYNC_MAX_WORKERS = 4
 
 
 class ConfigException(Exception):
@@ -27,13 +40,174 @@ class ConfigLoadFormatException(ConfigLoadException):
     pass
 
 
+class _InvalidValueException(ConfigException):
+    """
+    Raised when an expanded value doesn't match the schema, with the list of error messages
+    """
+
+    def __init__(self, error_list):
+        super(_InvalidValueException, self).__init__('Invalid config values: {}'.format(', '.join(error_list)))
+        self.error_list = error_list
+
+
+def _get_parser_backend(name = None, file_name = None):
+    try:
+        return get_parser_backend(name, file_name)
+
+    except ValueError as e:
+        raise ConfigException(str(e))
+
+
+# returned in place of config data for files that are not found
+_FILE_NOT_FOUND = object()
+
+# recorded for keys that were not set before a batch of updates, to delete them if the batch is rolled back
+_NOT_SET = object()
+
+
+def _run_in_executor(function, loop = None, executor = None):
+    """
+    Run a function on an executor from an asyncio event loop
+
+    :param loop: optional event loop, otherwise the current event loop
+    :param executor: optional executor, otherwise the default executor of the loop
+    :return: asyncio future for the function result
+    """
+
+    if loop is None:
+        try:
+            import asyncio
+
+        except ImportError:
+            raise ConfigException('asyncio is not available')
+
+        loop = asyncio.get_event_loop()
+
+    return loop.run_in_executor(executor, function)
+
+
+def _create_thread_pool(max_workers):
+    # multiprocessing is only imported if needed, as it adds to the import time
+    from multiprocessing.pool import ThreadPool
+
+    return ThreadPool(max_workers)
+
+
+def _fetch_config_data(config_loader):
+    """
+    Read the config data from a loader, on a thread pool
+
+    :return: list of config data dicts, or the exception raised
+    """
+
+    try:
+        return config_loader.get_data()
+
+    except ConfigException as e:
+        return e
+
+
+class _EvaluationState(threading.local):
+
+    def __init__(self):
+        self.key_list = []
+
+
+class _ConfigState(object):
+    """
+    Values of a config and the data derived from them, replaced in a single step when the config is reloaded
+
+    Readers take the state once, so they never combine the values of one load with the cached values of another. The
+    generation is increased by each change to the values, so values expanded during a change are not cached.
+    """
+
+    __slots__ = (
+        'config',
+        'sources',
+        'file_list',
+        'value_cache',
+        'reference_map',
+        'dependent_map',
+        'generation',
+    )
+
+    def __init__(self):
+        self.config = {}
+        self.sources = ''
+        self.file_list = []
+        self.value_cache = {}
+        self.reference_map = {}
+        self.dependent_map = {}
+        self.generation = 0
+
+
+class _IncludeGraph(object):
+    """
+    Config sources read while loading a config, and the sources each one includes
+    """
+
+    def __init__(self):
+        # source key to tuple of merged config data list and include source key list
+        self.node_map = {}
+        # keys and names of the sources currently being read
+        self.stack = []
+        self.name_list = []
+        # set if a source is included more than once
+        self.repeated = False
+
+    def get_merge_order(self, root_key):
+        """
+        Return the source keys in the order to merge them so each source is merged once, at its last include
+
+        Equivalent to the keys in the order they are included, keeping the last of any repeated keys.
+        """
+
+        key_list = []
+        visited_set = {root_key}
+        stack = [(root_key, iter(reversed(self.node_map[root_key][1])))]
+        while stack:
+            node_key, include_iterator = stack[-1]
+            for include_key in include_iterator:
+                if include_key not in visited_set:
+                    visited_set.add(include_key)
+                    stack.append((include_key, iter(reversed(self.node_map[include_key][1]))))
+                    break
+
+            else:
+                stack.pop()
+                key_list.append(node_key)
+
+        key_list.reverse()
+        return key_list
+
+
 class ConfigFileLoader(object):
 
-    def __init__(self, file_name, path_list = None, initial_config = False):
+    def __init__(
+            self,
+            file_name,
+            path_list = None,
+            initial_config = False,
+            cache = None,
+            yaml_loader = None,
+            backend = None,
+            path_index = None,
+            stream_key_set = None,
+            load_stats = None
+    ):
         self._file_name = file_name
         self._path_list = path_list if path_list else ['']
         self._initial_config = initial_config
+        self._cache = cache
+        self._yaml_loader = yaml_loader
+        self._path_index = path_index
+        self._stream_key_set = stream_key_set
+        self._load_stats = load_stats
+        self._backend = _get_parser_backend(backend) if backend is not None else None
+        # the cached data of a file depends on the options used to read it
+        self._read_key = (self._backend.name if self._backend is not None else None, yaml_loader, stream_key_set)
         self._loaded_file_list = []
+        self._checked_file_list = []
 
     @property
     def name_list(self):
@@ -43,6 +217,18 @@ class ConfigFileLoader(object):
     def names(self):
         return ', '.join(["'{}'".format(name) for name in self.name_list])
 
+    @property
+    def checked_file_list(self):
+        return self._checked_file_list
+
+    @property
+    def source_key(self):
+        """
+        Absolute names of the files that could be loaded, identifying the source
+        """
+
+        return tuple(os.path.abspath(file_name) for file_name in get_path_names(self._file_name, self._get_path_list()))
+
     @property
     def path_list(self):
         return self._path_list
@@ -51,20 +237,27 @@ class ConfigFileLoader(object):
     def initial_config(self):
         return self._initial_config
 
-    def get_data(self):
-        config_data_list = []
+    def get_data(self, pool = None):
+        """
+        Read the config data from each file found in the path list
+
+        :param pool: optional thread pool used to read the files concurrently
+        :return: list of config data dicts
+        """
 
-        path_list = self._path_list
-        if self._initial_config:
-            path_list = path_list[:1]
+        config_data_list = []
 
         self._loaded_file_list = []
-        for path in reversed(path_list):
-            file_name = os.path.join(path, self._file_name)
-            try:
-                config_data = read_yaml_file(file_name)
+        self._checked_file_list = get_path_names(self._file_name, self._get_path_list())[::-1]
 
-            except IOError:
+        if pool is not None and len(self._checked_file_list) > 1:
+            read_data_list = pool.map(self._read_file_if_found, self._checked_file_list)
+
+        else:
+            read_data_list = [self._read_file_if_found(file_name) for file_name in self._checked_file_list]
+
+        for file_name, config_data in zip(self._checked_file_list, read_data_list):
+            if config_data is _FILE_NOT_FOUND:
                 continue
 
             if not isinstance(config_data, dict):
@@ -86,15 +279,90 @@ class ConfigFileLoader(object):
 
         return config_data_list
 
+    def aget_data(self, loop = None, executor = None):
+        """
+        Read the config data on an executor without blocking the asyncio event loop
+
+        :return: asyncio future for the list of config data dicts
+        """
+
+        return _run_in_executor(self.get_data, loop = loop, executor = executor)
+
+    def _get_path_list(self):
+        return self._path_list[:1] if self._initial_config else self._path_list
+
+    def _read_file_if_found(self, file_name):
+        if self._load_stats is not None:
+            return self._read_file_if_found_timed(file_name)
+
+        if self._path_index is not None and self._path_index.exists(file_name) is False:
+            return _FILE_NOT_FOUND
+
+        try:
+            if self._cache is not None:
+                return self._cache.read(file_name, self._read_file, self._read_key)
+
+            return self._read_file(file_name)
+
+        except IOError:
+            return _FILE_NOT_FOUND
+
+    def _read_file_if_found_timed(self, file_name):
+        start_time = get_timer()
+        if self._path_index is not None and self._path_index.exists(file_name) is False:
+            self._load_stats.add_span(PHASE_RESOLVE, file_name, start_time, found = False)
+            return _FILE_NOT_FOUND
+
+        try:
+            if self._cache is not None:
+                return self._cache.read(
+                    file_name,
+                    self._read_file,
+                    self._read_key,
+                    hit_callback = lambda name: self._load_stats.add_span(PHASE_READ, name, start_time, cached = True)
+                )
+
+            return self._read_file(file_name)
+
+        except IOError:
+            self._load_stats.add_span(PHASE_RESOLVE, file_name, start_time, found = False)
+            return _FILE_NOT_FOUND
+
+    def _read_file(self, file_name):
+        if self._load_stats is None:
+            return self._parse_file(file_name)
+
+        start_time = get_timer()
+        config_data = self._parse_file(file_name)
+        self._load_stats.add_span(
+            PHASE_PARSE,
+            file_name,
+            start_time,
+            byte_count = os.path.getsize(file_name),
+            cached = False
+        )
+        return config_data
+
+    def _parse_file(self, file_name):
+        backend = self._backend or _get_parser_backend(file_name = file_name)
+        if self._stream_key_set and backend.name == PARSER_BACKEND_YAML:
+            from .stream import read_yaml_file_streamed
+
+            return read_yaml_file_streamed(file_name, self._stream_key_set, yaml_loader = self._yaml_loader)
+
+        return backend.read_file(file_name, yaml_loader = self._yaml_loader)
+
 
 class ConfigStringLoader(object):
 
     CONFIG_NAME = '<string>'
 
-    def __init__(self, config_string, path_list = None, initial_config = False):
+    def __init__(self, config_string, path_list = None, initial_config = False, yaml_loader = None, backend = None):
         self._config_string = config_string
         self._path_list = path_list
         self._initial_config = initial_config
+        self._yaml_loader = yaml_loader
+        self._backend = _get_parser_backend(backend)
 
     @property
     def name_list(self):
@@ -104,6 +372,14 @@ class ConfigStringLoader(object):
     def names(self):
         return self.CONFIG_NAME
 
+    @property
+    def checked_file_list(self):
+        return []
+
+    @property
+    def source_key(self):
+        return self.CONFIG_NAME
+
     @property
     def path_list(self):
         return self._path_list
@@ -112,8 +388,8 @@ class ConfigStringLoader(object):
     def initial_config(self):
         return self._initial_config
 
-    def get_data(self):
-        config_data = read_yaml_string(self._config_string)
+    def get_data(self, pool = None):
+        config_data = self._backend.read_string(self._config_string, yaml_loader = self._yaml_loader)
 
         if config_data is None:
             raise ConfigLoadException(
@@ -131,6 +407,15 @@ class ConfigStringLoader(object):
 
         return [config_data]
 
+    def aget_data(self, loop = None, executor = None):
+        """
+        Read the config data on an executor without blocking the asyncio event loop
+
+        :return: asyncio future for the list of config data dicts
+        """
+
+        return _run_in_executor(self.get_data, loop = loop, executor = executor)
+
 
 class Config(MutableMapping):
 
@@ -139,82 +424,889 @@ class Config(MutableMapping):
             from_file = None,
             from_string = None,
             path_list = None,
-            defaults = None
+            defaults = None,
+            cache = None,
+            yaml_loader = None,
+            backend = None,
+            resolve = False,
+            generated_file = None,
+            max_workers = None,
+            path_index = None,
+            merge_strategy = MERGE_REPLACE,
+            merge_strategy_map = None,
+            layered = False,
+            schema = None,
+            stream_keys = None,
+            instrument = None
     ):
-        self._path_list = path_list
+        self._init_state(
+            dict(
+                from_file = from_file,
+                from_string = from_string,
+                path_list = path_list,
+                defaults = defaults,
+                yaml_loader = yaml_loader,
+                backend = backend,
+                generated_file = generated_file,
+                max_workers = max_workers,
+                merge_strategy = merge_strategy,
+                merge_strategy_map = merge_strategy_map,
+                layered = layered,
+                schema = schema,
+                stream_keys = stream_keys
+            ),
+            cache,
+            path_index,
+            instrument
+        )
 
         if defaults and not isinstance(defaults, dict):
             raise ConfigException('Config defaults must be a dict')
-        self._config = deepcopy(defaults) if defaults else {}
+        if isinstance(defaults, FrozenDict):
+            # frozen defaults are shared, nested values are copied by the merge if they change
+            self._state.config = dict(defaults)
+
+        else:
+            self._state.config = deepcopy(defaults) if defaults else {}
 
-        self._uuid_cache = {}
+        if layered:
+            layered_config = LayeredConfig(merge_strategy, merge_strategy_map)
+            if self._state.config:
+                layered_config.add_layer(self._state.config, LAYER_DEFAULTS_NAME)
 
+            self._state.config = layered_config
+
+        self._build_dependency_graph()
+
+        start_time = get_timer() if self._load_stats is not None else None
         source_list = []
-        if from_file is not None:
-            config_loader = ConfigFileLoader(from_file, path_list = path_list, initial_config = True)
-            self._read_config(config_loader)
-            source_list.append(config_loader.names)
+        self._pool = _create_thread_pool(max_workers) if max_workers else None
+        # directory listings are only assumed to be unchanged while loading unless an index is given
+        self._load_path_index = path_index or PathIndex()
+        try:
+            if from_file is not None:
+                config_loader = ConfigFileLoader(
+                    from_file,
+                    path_list = path_list,
+                    initial_config = True,
+                    cache = cache,
+                    yaml_loader = yaml_loader,
+                    backend = backend,
+                    path_index = self._load_path_index,
+                    stream_key_set = self._stream_key_set,
+                    load_stats = self._load_stats
+                )
+                self._read_config(config_loader)
+                source_list.append(config_loader.names)
+
+            if from_string is not None:
+                config_loader = ConfigStringLoader(
+                    from_string,
+                    path_list = path_list,
+                    initial_config = True,
+                    yaml_loader = yaml_loader,
+                    backend = backend
+                )
+                self._read_config(config_loader)
+                source_list.append(config_loader.names)
+
+        finally:
+            if self._pool is not None:
+                # the worker threads exit once idle, joining them would add the pool handler polling interval
+                self._pool.close()
+                self._pool = None
+
+            self._load_path_index = None
+
+        self._state.sources = ','.join(source_list)
+
+        if self._schema is not None:
+            self._validate()
+
+        if start_time is not None:
+            self._load_stats.add_span(PHASE_LOAD, None, start_time)
+
+        if resolve:
+            self.resolve()
+
+    def _init_state(self, options, cache = None, path_index = None, instrument = None):
+        # options are kept to reload the config if a snapshot is out of date
+        self._options = options
+        self._path_list = options['path_list']
+        self._cache = cache
+        self._path_index = path_index
+        self._load_path_index = None
+        # kept to record the stats again on reload
+        self._instrument = instrument
+        if instrument is None or instrument is False:
+            self._load_stats = None
+
+        else:
+            self._load_stats = instrument if isinstance(instrument, LoadStats) else LoadStats()
+
+        try:
+            self._merger = ConfigMerger(
+                options.get('merge_strategy', MERGE_REPLACE),
+                options.get('merge_strategy_map')
+            )
+
+            schema = options.get('schema')
+            self._schema = schema if schema is None or isinstance(schema, Schema) else Schema(schema)
+
+        except ValueError as e:
+            raise ConfigException(str(e))
+
+        self._yaml_loader = options['yaml_loader']
+        stream_keys = options.get('stream_keys')
+        self._stream_key_set = frozenset(stream_keys) if stream_keys else None
+        self._pool = None
+        self._state = _ConfigState()
+        self._evaluation_state = _EvaluationState()
+        # writers hold the lock, readers use the published snapshot without it
+        self._write_lock = threading.RLock()
+        self._undo_map = None
+        self._snapshot = None
+        # set while the first snapshot is frozen, as values set outside a batch don't take the lock
+        self._snapshot_pending = False
+        self._generated_value_store = GeneratedValueStore(options.get('generated_file'))
+
+    @classmethod
+    def aload(cls, loop = None, executor = None, max_workers = ASYNC_MAX_WORKERS, **kwargs):
+        """
+        Create a config on an executor without blocking the asyncio event loop
+
+        Use as ``config = await Config.aload(from_file = 'config.yml')``. Includes are read concurrently on a thread
+        pool, as with the max_workers option of Config.
+
+        :param loop: optional event loop, otherwise the current event loop
+        :param executor: optional executor, otherwise the default executor of the loop
+        :param max_workers: maximum number of includes read concurrently
+        :param kwargs: Config options
+        :return: asyncio future for the Config object
+        """
+
+        return _run_in_executor(partial(cls, max_workers = max_workers, **kwargs), loop = loop, executor = executor)
+
+    @classmethod
+    def from_snapshot(cls, file_name, cache = None, update = True):
+        """
+        Create a config from a snapshot file written by compile
+
+        The snapshot is used if none of the files checked when the config was loaded have changed. Otherwise the config
+        is loaded again using the original options and, if update is set, the snapshot is rewritten.
+
+        :param file_name: snapshot file name
+        :param cache: optional FileDataCache used if the config is loaded again
+        :param update: rewrite the snapshot if it is out of date
+        :return: Config object
+        """
+
+        snapshot_data = read_snapshot(file_name)
+        if snapshot_data is None:
+            raise ConfigLoadException("Unable to load config snapshot: '{}'".format(file_name))
+
+        config = cls.__new__(cls)
+        config._init_state(snapshot_data['options'], cache)
+        config._state.config = snapshot_data['config']
+        config._state.sources = snapshot_data['sources']
+        config._state.file_list = snapshot_data['file_list']
+        config._build_dependency_graph()
+
+        if not config.changed_file_list:
+            log.info("Loaded config snapshot: '%s'", file_name)
+            return config
+
+        log.info("Config snapshot out of date: '%s'", file_name)
+        config = cls(cache = cache, **snapshot_data['options'])
+
+        if update:
+            try:
+                config.compile(file_name)
 
-        if from_string is not None:
-            config_loader = ConfigStringLoader(from_string, path_list = path_list, initial_config = True)
-            self._read_config(config_loader)
-            source_list.append(config_loader.names)
+            except (IOError, OSError) as e:
+                log.warning("Unable to update config snapshot: '%s': %s", file_name, e)
 
-        self._sources = ','.join(source_list)
+        return config
+
+    def compile(self, file_name):
+        """
+        Write a snapshot of the config to a file, to be loaded by from_snapshot
+
+        The snapshot contains the current config values, and the state of each file checked when the config was loaded.
+
+        :raises ConfigException: if the values or options can't be pickled, e.g. a schema using a lambda
+        """
+
+        try:
+            write_snapshot(
+                file_name,
+                {
+                    'config': self._state.config,
+                    'sources': self._state.sources,
+                    'file_list': self._state.file_list,
+                    'options': self._options,
+                }
+            )
+
+        except ValueError as e:
+            raise ConfigException(str(e))
+
+    def publish_shared(self, file_name):
+        """
+        Publish the expanded config values to be read by SharedConfig, e.g. in pre-forked worker processes
+
+        Each call publishes a new generation, which readers use when they call refresh. Values are pickled, so the
+        files should only be written to trusted locations.
+
+        :param file_name: control file name
+        :return: generation
+        :raises ConfigException: if expressions can't be expanded
+        """
+
+        from .shared import write_shared
+
+        return write_shared(file_name, self.freeze(), self._state.sources)
 
     @property
     def sources(self):
-        return self._sources
+        return self._state.sources
+
+    def get_key_sources(self, key):
+        """
+        Return the names of the sources the value of a key comes from, with the last loaded first
+
+        Only available if the config was created with the layered option. Values set at runtime are reported as from
+        the source '<runtime>', and defaults from '<defaults>'.
+
+        :return: list of source names, empty if the key is not set
+        """
+
+        if not isinstance(self._state.config, LayeredConfig):
+            raise ConfigException('Key sources are only recorded for layered configs')
+
+        return self._state.config.get_sources(key)
+
+    @property
+    def load_stats(self):
+        """
+        Time spent loading the config, if the config was created with the instrument option
+
+        :return: LoadStats object, or None
+        """
+
+        return self._load_stats
+
+    @property
+    def file_list(self):
+        """
+        Absolute names of the files checked when loading the config, including files that were not found
+
+        :return: list of tuples of file name and the file id when loaded, or None if the file was not found
+        """
+
+        return self._state.file_list
+
+    @property
+    def changed_file_list(self):
+        """
+        Names of the files checked when loading the config that have since been changed, added or removed
+        """
+
+        return [file_name for file_name, file_id in self._state.file_list if get_file_id(file_name) != file_id]
+
+    def reload(self):
+        """
+        Load the config again using the original options
+
+        The new values replace the current values in a single step, so readers never see a partially loaded config.
+        Values set since the config was loaded are discarded. Parsed files are cached, so later reloads only parse the
+        files that have changed. If the config was created without a cache, the first reload parses every file, so
+        pass a FileDataCache when creating a config that will be reloaded.
+
+        :return: set of top level keys that were added, removed or changed
+        """
+
+        if self._cache is None:
+            self._cache = FileDataCache()
+
+        config = self.__class__(
+            cache = self._cache,
+            path_index = self._path_index,
+            instrument = self._instrument,
+            **self._options
+        )
+
+        # values expanded while loading used the generated values of the new config, so are expanded again
+        state = config._state
+        state.value_cache = {}
+
+        with self._write_lock:
+            previous_config = self._state.config
+            self._state = state
+            self._load_stats = config._load_stats
+            if self._snapshot is not None:
+                self._snapshot = self.freeze()
+
+        missing = object()
+        return {
+            key for key in set(previous_config) | set(self._state.config)
+            if previous_config.get(key, missing) != self._state.config.get(key, missing)
+        }
 
     def expand_parameter(self, value):
-        # TODO process values
+        """
+        Expand the expressions in a value
+
+        Strings in nested dicts and lists are also expanded. A container is only copied if it contains an expression.
+
+        :return: expanded value
+        """
+
+        if is_expression(value):
+            try:
+                expression = compile_expression(value)
+
+            except ValueError as e:
+                raise ConfigException(str(e))
+
+            return expression(self._lookup_path, self._generate_value)
+
+        if isinstance(value, dict):
+            expanded_value = {key: self.expand_parameter(item) for key, item in value.items()}
+            if any(expanded_value[key] is not item for key, item in value.items()):
+                return expanded_value
+
+        elif isinstance(value, list):
+            expanded_value = [self.expand_parameter(item) for item in value]
+            if any(expanded_item is not item for expanded_item, item in zip(expanded_value, value)):
+                return expanded_value
+
+        return value
+
+    def resolve(self):
+        """
+        Expand all values now, in dependency order
+
+        :raises ConfigException: if expressions refer to each other in a cycle
+        """
+
+        for key in self._get_resolve_order():
+            self[key]
+
+        for key in self._state.config:
+            self[key]
+
+    def _validate(self):
+        """
+        Check the expanded values against the schema
+
+        Values are converted when they are expanded, and the converted values are cached with the expanded values, so
+        values containing expressions are converted again when the values they refer to change.
+
+        :raises ConfigLoadFormatException: listing every value that is not valid
+        """
+
+        start_time = get_timer() if self._load_stats is not None else None
+        error_list = self._schema.get_missing_errors(self._state.config)
+        for key in self._schema.spec:
+            if key in self._state.config:
+                try:
+                    self[key]
+
+                except _InvalidValueException as e:
+                    error_list.extend(e.error_list)
+
+        if start_time is not None:
+            self._load_stats.add_span(PHASE_VALIDATE, None, start_time, error_count = len(error_list))
+
+        if error_list:
+            raise ConfigLoadFormatException('Invalid config values: {}'.format(', '.join(error_list)))
+
+    def freeze(self):
+        """
+        Return a read only snapshot of the config, with all values expanded
+
+        Nested dicts and lists in the snapshot are read only, and values are read with a single dict lookup.
+
+        :return: FrozenConfig object
+        :raises ConfigException: if expressions can't be expanded
+        """
+
+        self.resolve()
+        return FrozenConfig(((key, freeze(self[key])) for key in self._state.config), self._state.sources)
+
+    @property
+    def snapshot(self):
+        """
+        The current read only snapshot of the config, kept up to date as values are set
+
+        Reading the property doesn't take a lock, so threads can read the config while another thread updates it. Each
+        snapshot is consistent, and a batch of updates is published as a single new snapshot. The first read freezes
+        the config, and values are only frozen again for the keys that change. If the changed values can't be
+        expanded, the snapshot is frozen again when it is next read, which raises the error.
+
+        :return: FrozenConfig object
+        :raises ConfigException: if expressions can't be expanded
+        """
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._write_lock:
+                if self._snapshot is None:
+                    self._snapshot_pending = True
+                    try:
+                        self._snapshot = self.freeze()
+
+                    finally:
+                        self._snapshot_pending = False
+
+                snapshot = self._snapshot
+
+        return snapshot
+
+    @contextmanager
+    def update_batch(self):
+        """
+        Context manager to set and delete values as a single update
+
+        Use as ``with config.update_batch(): ...``. Other threads can't update the config until the batch ends, then
+        the snapshot is updated in one step, so readers of the snapshot see either none or all of the changes. If the
+        batch raises an exception, the changes are rolled back. Batches can be nested, and only the outermost batch
+        publishes the changes.
+
+        :return: the config
+        """
+
+        with self._write_lock:
+            if self._undo_map is not None:
+                yield self
+                return
+
+            undo_map = self._undo_map = {}
+            try:
+                yield self
+
+            except BaseException:
+                self._roll_back(undo_map)
+                raise
+
+            finally:
+                self._undo_map = None
+
+            self._publish_snapshot(undo_map)
+
+    def _publish_snapshot(self, key_set):
+        """
+        Replace the snapshot with a copy that has new values for the changed keys and the keys that refer to them
+
+        Values for the other keys are shared with the previous snapshot, so the cost of publishing is a single copy of
+        the top level dict, O(top level keys), plus freezing the changed values. Errors expanding the values are raised
+        when the snapshot is next read, so setting values doesn't depend on whether the snapshot has been read.
+        """
+
+        snapshot = self._snapshot
+        if snapshot is None or not key_set:
+            return
+
+        key_list = list(key_set)
+        changed_set = set()
+        while key_list:
+            key = key_list.pop()
+            if key not in changed_set:
+                changed_set.add(key)
+                key_list.extend(self._state.dependent_map.get(key, ()))
+
+        # the copy isn't visible to readers until it is published, so is updated in place with the dict methods
+        new_snapshot = FrozenConfig(snapshot, self._state.sources)
+        try:
+            for key in changed_set:
+                if key in self._state.config:
+                    dict.__setitem__(new_snapshot, key, freeze(self[key]))
+
+                else:
+                    dict.pop(new_snapshot, key, None)
+
+        except ConfigException:
+            self._snapshot = None
+            return
+
+        self._snapshot = new_snapshot
+
+    def _roll_back(self, undo_map):
+        config = self._state.config
+        for key, value in undo_map.items():
+            if isinstance(config, LayeredConfig):
+                config.restore_override(key, value)
+
+            elif value is not _NOT_SET:
+                config[key] = value
+
+            elif key in config:
+                del config[key]
+
+            self._update_dependencies(key)
+
+    def _record_update(self, key):
+        if key not in self._undo_map:
+            config = self._state.config
+            if isinstance(config, LayeredConfig):
+                # the runtime value is restored, not the value merged from the layers
+                self._undo_map[key] = config.get_override(key)
+
+            else:
+                self._undo_map[key] = config[key] if key in config else _NOT_SET
+
+    def _get_resolve_order(self):
+        """
+        Return the keys containing expressions ordered so that each key follows the keys it refers to
+        """
+
+        key_list = []
+        visited_set = set()
+        for key in self._state.reference_map:
+            if key in visited_set:
+                continue
+
+            path = [key]
+            iterator_list = [iter(self._state.reference_map[key])]
+            while iterator_list:
+                for name in iterator_list[-1]:
+                    if name in path:
+                        raise self._circular_reference_exception(path[path.index(name):] + [name])
+
+                    if name in self._state.reference_map and name not in visited_set:
+                        path.append(name)
+                        iterator_list.append(iter(self._state.reference_map[name]))
+                        break
+
+                else:
+                    iterator_list.pop()
+                    visited_set.add(path[-1])
+                    key_list.append(path.pop())
+
+        return key_list
+
+    @staticmethod
+    def _circular_reference_exception(key_list):
+        return ConfigException(
+            'Circular reference in config expressions: {}'.format(
+                ' -> '.join(["'{}'".format(key) for key in key_list])
+            )
+        )
+
+    def _build_dependency_graph(self):
+        self._state.value_cache = {}
+        self._state.reference_map = {}
+        self._state.dependent_map = {}
+        for key in self._state.config:
+            self._update_dependencies(key)
+
+    def _update_dependencies(self, key):
+        """
+        Update the names referred to by the expressions in a value, and clear the cached values that depend on it
+        """
+
+        for name in self._state.reference_map.pop(key, ()):
+            dependent_set = self._state.dependent_map[name]
+            dependent_set.discard(key)
+            if not dependent_set:
+                del self._state.dependent_map[name]
+
+        if isinstance(self._state.config, LayeredConfig):
+            # find the references without merging the values
+            reference_set = set()
+            for value in self._state.config.get_value_list(key):
+                reference_set.update(get_references(value))
+
+        else:
+            reference_set = get_references(self._state.config[key]) if key in self._state.config else None
+
+        if reference_set:
+            self._state.reference_map[key] = reference_set
+            for name in reference_set:
+                self._state.dependent_map.setdefault(name, set()).add(key)
+
+        # values being expanded by other threads may have read the previous value
+        self._state.generation += 1
+
+        key_list = [key]
+        cleared_set = set()
+        while key_list:
+            key = key_list.pop()
+            if key not in cleared_set:
+                cleared_set.add(key)
+                self._state.value_cache.pop(key, None)
+                key_list.extend(self._state.dependent_map.get(key, ()))
+
+    def _generate_value(self, name, label):
+        """
+        Return a generated value, which is only generated once for each generator name and label
+
+        The label defaults to the top level key being expanded.
+        """
+
+        if label is None:
+            key_list = self._evaluation_state.key_list
+            label = key_list[-1] if key_list else ''
+
+        return self._generated_value_store.get(name, label)
+
+    def _lookup_path(self, path):
+        try:
+            value = self[path[0]]
+            for name in path[1:]:
+                value = value[int(name) if isinstance(value, list) else name]
+
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise ConfigException("Unknown config key in expression: '{}'".format('.'.join(path)))
+
+        return value
+
+    def get_path(self, path, default = NO_DEFAULT):
+        """
+        Return the expanded value at a dotted path, e.g. 'db.pool.size', or 'server.hosts.0' for an item in a list
+
+        The path is looked up in the cached expanded value of the top level key, so nested values changed in place are
+        read as they are now. The path can be a ConfigPath, created once with compile_path to avoid parsing it on each
+        call.
+
+        :param path: dotted path string or ConfigPath
+        :param default: value returned if the path is not found
+        :return: value
+        :raises KeyError: if the path is not found and there is no default, naming the first missing part of the path
+        """
+
+        try:
+            return get_path_value(self, path, default)
+
+        except ValueError as e:
+            raise ConfigException(str(e))
+
+    def _convert_value(self, key, value):
+        value, error_list = self._schema.validate_value(key, value)
+        if error_list:
+            raise _InvalidValueException(error_list)
+
         return value
 
     def __getitem__(self, key):
-        if key in self._config:
-            return self.expand_parameter(self._config[key])
+        # expanded values are cached until the config is modified
+        state = self._state
+        try:
+            return state.value_cache[key]
+
+        except KeyError:
+            pass
+
+        if key in state.config:
+            # track the keys being expanded to detect circular references
+            key_list = self._evaluation_state.key_list
+            if key in key_list:
+                raise self._circular_reference_exception(key_list[key_list.index(key):] + [key])
+
+            generation = state.generation
+            key_list.append(key)
+            try:
+                value = self.expand_parameter(state.config[key])
+                if self._schema is not None:
+                    value = self._convert_value(key, value)
+
+            finally:
+                key_list.pop()
+
+            if state.generation == generation:
+                state.value_cache[key] = value
+                if state.generation != generation:
+                    # changed while caching the value, which may have been after the change cleared the cache
+                    state.value_cache.pop(key, None)
+
+            return value
 
         raise KeyError("'" + key + "'")
 
+    def _publish_unbatched(self, key):
+        """
+        Publish a value set outside a batch, if a snapshot was frozen while it was being set
+        """
+
+        if self._snapshot is not None or self._snapshot_pending:
+            with self._write_lock:
+                self._publish_snapshot({key})
+
     def __setitem__(self, key, value):
-        self._config[key] = value
+        if self._snapshot is None and self._undo_map is None:
+            # there is no snapshot to publish or batch to roll back, so the value is set without the lock
+            self._state.config[key] = value
+            self._update_dependencies(key)
+            self._publish_unbatched(key)
+            return
+
+        with self.update_batch():
+            self._record_update(key)
+            self._state.config[key] = value
+            self._update_dependencies(key)
 
     def __delitem__(self, key):
-        if key in self._config:
-            del self._config[key]
-
-        else:
+        if key not in self._state.config:
             raise KeyError("'" + key + "'")
 
+        if self._snapshot is None and self._undo_map is None:
+            del self._state.config[key]
+            self._update_dependencies(key)
+            self._publish_unbatched(key)
+            return
+
+        with self.update_batch():
+            if key not in self._state.config:
+                raise KeyError("'" + key + "'")
+
+            self._record_update(key)
+            del self._state.config[key]
+            self._update_dependencies(key)
+
     def __iter__(self):
-        return iter(self._config)
+        return iter(self._state.config)
 
     def __len__(self):
-        return len(self._config)
+        return len(self._state.config)
 
     def _read_config(self, config_loader):
-        self._read_config_core(config_loader)
+        """
+        Read and merge a config source and its includes
+
+        Each distinct include is read once. If an include is reached more than once, it is merged again at the
+        position of its last include, which gives the same result as reading it each time. The expression dependencies
+        are found once all the sources are merged.
+        """
+
+        base_config = self._state.config.copy()
+        self._merger.reset(self._state.config)
+        include_graph = _IncludeGraph()
+        root_key = self._read_config_node(config_loader, include_graph)
+
+        if include_graph.repeated:
+            self._state.config = base_config
+            self._merger.reset(self._state.config)
+            for node_key in include_graph.get_merge_order(root_key):
+                for source_name, config_data in include_graph.node_map[node_key][0]:
+                    self._merge_config_data(config_data, source_name)
+
+        self._build_dependency_graph()
+
+    def _read_config_node(self, config_loader, include_graph, fetched_data = None):
+        """
+        Read and merge a config source, then read its includes
+
+        :param fetched_data: optional result of _fetch_config_data for the loader, if already read
+        :return: key of the source in the include graph
+        """
+
+        node_key = config_loader.source_key
+        if node_key in include_graph.stack:
+            name_list = include_graph.name_list[include_graph.stack.index(node_key):] + [config_loader.names]
+            raise ConfigLoadFormatException("Circular config include: {}".format(' -> '.join(name_list)))
+
+        if node_key in include_graph.node_map:
+            include_graph.repeated = True
+            return node_key
+
+        try:
+            source_list, include_data_list = self._read_config_core(
+                config_loader,
+                fetched_data,
+                depth = len(include_graph.stack)
+            )
+
+        finally:
+            self._state.file_list.extend(
+                (os.path.abspath(file_name), get_file_id(file_name))
+                for file_name in config_loader.checked_file_list
+            )
 
         if config_loader.initial_config:
             log.info("Loaded config: %s", config_loader.names)
 
-        for config_data in config_loader.get_data():
-            self._read_config_includes(CONFIG_INCLUDE_KEY, config_data, config_loader)
-            self._read_config_includes(CONFIG_INCLUDE_OPTIONAL_KEY, config_data, config_loader, optional = True)
+        include_key_list = []
+        include_graph.node_map[node_key] = (source_list, include_key_list)
+        include_graph.stack.append(node_key)
+        include_graph.name_list.append(config_loader.names)
+
+        for include_data in include_data_list:
+            include_key_list.extend(
+                self._read_config_includes(CONFIG_INCLUDE_KEY, include_data, config_loader, include_graph)
+            )
+            include_key_list.extend(
+                self._read_config_includes(
+                    CONFIG_INCLUDE_OPTIONAL_KEY,
+                    include_data,
+                    config_loader,
+                    include_graph,
+                    optional = True
+                )
+            )
+
+        include_graph.stack.pop()
+        include_graph.name_list.pop()
+
+        return node_key
+
+    def _read_config_core(self, config_loader, fetched_data = None, depth = 0):
+        """
+        Parse and merge the config data from a loader
+
+        Each source is parsed once. The include lists are removed from the data before merging and returned so the
+        includes can be processed without parsing the sources again.
+
+        :param depth: include depth of the source, recorded in the load stats
+        :return: tuple of the list of tuples of source name and merged dict, and the list of dicts containing the
+            include lists of each source
+        """
+
+        if fetched_data is None:
+            config_data_list = config_loader.get_data(pool = self._pool)
+
+        elif isinstance(fetched_data, Exception):
+            raise fetched_data
+
+        else:
+            config_data_list = fetched_data
+
+        source_list = list(zip(config_loader.name_list, config_data_list))
+        include_data_list = []
+        for source_name, config_data in source_list:
+            include_data = {}
+            for include_key in (CONFIG_INCLUDE_KEY, CONFIG_INCLUDE_OPTIONAL_KEY):
+                if include_key in config_data:
+                    include_data[include_key] = config_data.pop(include_key)
+
+            start_time = get_timer() if self._load_stats is not None else None
+            self._merge_config_data(config_data, source_name)
+            if self._state.value_cache:
+                # values expanded for include names may have changed
+                self._state.value_cache.clear()
 
-    def _read_config_core(self, config_loader):
-        config_data_list = config_loader.get_data()
+            if start_time is not None:
+                self._load_stats.add_span(PHASE_MERGE, source_name, start_time, depth = depth)
 
-        for config_data in config_data_list:
-            if 'include' in config_data:
-                del(config_data['include'])
+            include_data_list.append(include_data)
 
-            if 'include_optional' in config_data:
-                del(config_data['include_optional'])
+        return source_list, include_data_list
 
-            self._config.update(config_data)
+    def _merge_config_data(self, config_data, source_name):
+        if isinstance(self._state.config, LayeredConfig):
+            self._state.config.add_layer(config_data, source_name)
 
-    def _read_config_includes(self, include_key, config_data, config_loader, optional = False):
+        else:
+            self._merger.merge(self._state.config, config_data)
+
+    def _read_config_includes(self, include_key, config_data, config_loader, include_graph, optional = False):
+        """
+        Read the includes listed in config data
+
+        :return: list of the keys of the includes read in the include graph
+        """
+
+        include_node_key_list = []
         if include_key in config_data:
             if not isinstance(config_data[include_key], list):
                 raise ConfigLoadFormatException(
@@ -224,14 +1316,19 @@ class Config(MutableMapping):
                     )
                 )
 
+            fetched_map = self._fetch_includes(config_data[include_key], config_loader, include_graph)
+
             for include_file_name in config_data[include_key]:
                 include_file_name_full = self.expand_parameter(include_file_name)
                 try:
-                    include_config_loader = ConfigFileLoader(
-                        include_file_name_full,
-                        path_list = config_loader.path_list
+                    include_config_loader = self._get_include_loader(include_file_name_full, config_loader)
+                    include_config_loader, fetched_data = fetched_map.get(
+                        include_config_loader.source_key,
+                        (include_config_loader, None)
+                    )
+                    include_node_key_list.append(
+                        self._read_config_node(include_config_loader, include_graph, fetched_data)
                     )
-                    self._read_config(include_config_loader)
 
                 except ConfigLoadFormatException:
                     raise
@@ -251,11 +1348,55 @@ class Config(MutableMapping):
                             config_loader.names
                         )
 
+        return include_node_key_list
+
+    def _get_include_loader(self, include_file_name, config_loader):
+        return ConfigFileLoader(
+            include_file_name,
+            path_list = config_loader.path_list,
+            cache = self._cache,
+            yaml_loader = self._yaml_loader,
+            path_index = self._load_path_index,
+            stream_key_set = self._stream_key_set,
+            load_stats = self._load_stats
+        )
+
+    def _fetch_includes(self, include_file_name_list, config_loader, include_graph):
+        """
+        Read a list of includes concurrently on the thread pool, if configured
+
+        Includes named with expressions are not read, as the expressions may depend on the includes before them.
+        The includes are merged in order afterwards, so the result is the same as reading them one at a time.
+
+        :return: dict of source key to tuple of loader and _fetch_config_data result
+        """
+
+        if self._pool is None or len(include_file_name_list) < 2:
+            return {}
+
+        include_config_loader_map = {}
+        for include_file_name in include_file_name_list:
+            if not isinstance(include_file_name, string_types) or is_expression(include_file_name):
+                continue
+
+            include_config_loader = self._get_include_loader(include_file_name, config_loader)
+            source_key = include_config_loader.source_key
+            if source_key not in include_graph.node_map and source_key not in include_graph.stack:
+                include_config_loader_map.setdefault(source_key, include_config_loader)
+
+        include_config_loader_list = list(include_config_loader_map.values())
+        fetched_data_list = self._pool.map(_fetch_config_data, include_config_loader_list)
+
+        return {
+            include_config_loader.source_key: (include_config_loader, fetched_data)
+            for include_config_loader, fetched_data in zip(include_config_loader_list, fetched_data_list)
+        }
+
     def __str__(self):
         return unicode(self).decode('utf-8')
 
     def __unicode__(self):
-        return unicode(self._config)
+        return unicode(self._state.config)
 
     def __repr__(self):
         return "{}(\n{}\n)".format(
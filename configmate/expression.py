@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+import re
+from .generated import get_generator
+
+
+try:
+    string_types = (basestring,)  # noqa: F821
+    text_type = unicode  # noqa: F821
+
+except NameError:
+    string_types = (str,)
+    text_type = str
+
+
+EXPRESSION_START = '$'
+EXPRESSION_CACHE_SIZE = 4096
+
+_token_regex = re.compile(r'\$(?:(\$)|\{([^{}]*)\})')
+_name_regex = re.compile(r'^[A-Za-z0-9_-]+$')
+_generator_regex = re.compile(r'^([A-Za-z0-9_-]+)\(\s*([A-Za-z0-9_.-]*)\s*\)$')
+
+_expression_cache = {}
+
+
+class GeneratorCall(object):
+    """
+    Generated value expression
+    """
+
+    __slots__ = ('name', 'label')
+
+    def __init__(self, name, label):
+        self.name = name
+        self.label = label
+
+
+def is_expression(value):
+    """
+    Return True if a value is a string that may contain expressions
+    """
+
+    return isinstance(value, string_types) and EXPRESSION_START in value
+
+
+def compile_expression(template):
+    """
+    Compile a string containing expressions to a function
+
+    Expressions are of the form ${name} or ${name.child.0}, and are replaced by the value of the named key. A dotted
+    name refers to a key in a nested dict, or an index in a nested list. Expressions of the form ${generator()} or
+    ${generator(label)} are replaced by a generated value, such as a UUID. Use $$ for a literal $. If the string is a
+    single expression the value is returned as is, otherwise each value is converted to a string.
+
+    The compiled function is called with a lookup function, which is passed a tuple of the names in an expression and
+    returns the value, and a generate function, which is passed the generator name and label (or None) and returns the
+    generated value. The tuples of names referenced are stored in the reference_list attribute of the function.
+    Compiled functions are cached by template string.
+
+    :param template: string to compile
+    :return: compiled function
+    :raises ValueError: if the string contains an invalid expression
+    """
+
+    try:
+        return _expression_cache[template]
+
+    except KeyError:
+        pass
+
+    part_list = _parse_expression(template)
+
+    if len(part_list) == 1 and not isinstance(part_list[0], string_types):
+        single_part = part_list[0]
+
+        def expression(lookup, generate):
+            return _evaluate_part(single_part, lookup, generate)
+
+    elif all(isinstance(part, string_types) for part in part_list):
+        value = ''.join(part_list)
+
+        def expression(lookup, generate):
+            return value
+
+    else:
+        def expression(lookup, generate):
+            return ''.join([
+                text_type(_evaluate_part(part, lookup, generate))
+                for part in part_list
+            ])
+
+    expression.reference_list = [path for path in part_list if isinstance(path, tuple)]
+
+    if len(_expression_cache) >= EXPRESSION_CACHE_SIZE:
+        _expression_cache.clear()
+
+    _expression_cache[template] = expression
+
+    return expression
+
+
+def get_references(value):
+    """
+    Return the top level names referenced by the expressions in a value, including in nested dicts and lists
+
+    Invalid expressions are ignored.
+
+    :return: set of names
+    """
+
+    reference_set = set()
+    value_list = [value]
+    while value_list:
+        value = value_list.pop()
+        if is_expression(value):
+            try:
+                expression = compile_expression(value)
+
+            except ValueError:
+                continue
+
+            reference_set.update(path[0] for path in expression.reference_list)
+
+        elif isinstance(value, dict):
+            value_list.extend(value.values())
+
+        elif isinstance(value, list):
+            value_list.extend(value)
+
+    return reference_set
+
+
+def _evaluate_part(part, lookup, generate):
+    if isinstance(part, tuple):
+        return lookup(part)
+
+    if isinstance(part, GeneratorCall):
+        return generate(part.name, part.label)
+
+    return part
+
+
+def _parse_expression(template):
+    """
+    Split a string into literal strings and tuples of names referenced by expressions
+    """
+
+    part_list = []
+    position = 0
+    for match in _token_regex.finditer(template):
+        if match.start() > position:
+            part_list.append(template[position:match.start()])
+
+        if match.group(1):
+            part_list.append(match.group(1))
+
+        else:
+            part_list.append(_parse_expression_body(match.group(2).strip(), match.group(0)))
+
+        position = match.end()
+
+    if position < len(template):
+        part_list.append(template[position:])
+
+    if any(isinstance(part, string_types) and '${' in part for part in part_list):
+        raise ValueError("Unterminated expression: '{}'".format(template))
+
+    return part_list
+
+
+def _parse_expression_body(body, expression):
+    """
+    Parse the text between the braces of an expression to a tuple of names or a generator call
+    """
+
+    generator_match = _generator_regex.match(body)
+    if generator_match:
+        name, label = generator_match.groups()
+        get_generator(name)
+        return GeneratorCall(name, label or None)
+
+    path = tuple(name.strip() for name in body.split('.'))
+    if not all(_name_regex.match(name) for name in path):
+        raise ValueError("Invalid expression: '{}'".format(expression))
+
+    return path
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import print_function, unicode_literals
+from collections import namedtuple, OrderedDict
+from copy import deepcopy
 import os
-import yaml
-import yaml.scanner
+import threading
 import logging
 
 
@@ -15,20 +16,72 @@ def construct_yaml_str(self, node):
     return self.construct_scalar(node)
 
 
-# Replace YAML string constructor to ensure string values returned as unicode
-yaml.SafeLoader.add_constructor(u'tag:yaml.org,2002:str', construct_yaml_str)
+# yaml loader classes to the private subclasses used to load config, set up on first use
+_yaml_loader_map = None
 
 
-def read_yaml_file(file_name):
+def _get_yaml_loader_map():
+    global _yaml_loader_map
+
+    if _yaml_loader_map is None:
+        # yaml is imported on first use, as it adds to the import time of applications that may not use it
+        import yaml
+
+        loader_map = OrderedDict()
+        # Use the libyaml based loader if available
+        for loader_name in ('CSafeLoader', 'SafeLoader'):
+            loader_class = getattr(yaml, loader_name, None)
+            if loader_class is not None:
+                # Replace YAML string constructor to ensure string values returned as unicode, without changing the
+                # yaml classes
+                config_loader_class = type(str('_Config' + loader_name), (loader_class,), {})
+                config_loader_class.add_constructor(u'tag:yaml.org,2002:str', construct_yaml_str)
+                loader_map[loader_class] = config_loader_class
+
+        _yaml_loader_map = loader_map
+
+    return _yaml_loader_map
+
+
+def get_yaml_loader_list():
+    """
+    Return the available safe YAML loader classes, fastest first
+
+    :return: list of yaml loader classes, that can be passed as the yaml_loader option
+    """
+
+    return list(_get_yaml_loader_map())
+
+
+def get_yaml_loader(yaml_loader = None):
+    """
+    Return the loader class used to load YAML config
+
+    :param yaml_loader: optional YAML loader class, otherwise the fastest safe loader available
+    :return: private subclass of a yaml safe loader class, or the loader class if it is not a yaml safe loader
+    """
+
+    loader_map = _get_yaml_loader_map()
+    if yaml_loader is None:
+        return next(iter(loader_map.values()))
+
+    return loader_map.get(yaml_loader, yaml_loader)
+
+
+def read_yaml_file(file_name, yaml_loader = None):
     """
     Read a file as YAML
 
+    :param yaml_loader: optional YAML loader class, otherwise use the default
     :return: parsed YAML data, or None on error
     """
 
+    loader_class = get_yaml_loader(yaml_loader)
+    import yaml.scanner
+
     try:
         with open(file_name, 'r') as file_object:
-            return yaml.safe_load(file_object)
+            return yaml.load(file_object, Loader = loader_class)
 
     except yaml.scanner.ScannerError as e:
         log.error('Invalid YAML data: {}'.format(e))
@@ -36,15 +89,19 @@ def read_yaml_file(file_name):
     return None
 
 
-def read_yaml_string(data):
+def read_yaml_string(data, yaml_loader = None):
     """
     Read a string as YAML
 
+    :param yaml_loader: optional YAML loader class, otherwise use the default
     :return: parsed YAML data, or None on error
     """
 
+    loader_class = get_yaml_loader(yaml_loader)
+    import yaml.scanner
+
     try:
-        return yaml.safe_load(data)
+        return yaml.load(data, Loader = loader_class)
 
     except yaml.scanner.ScannerError as e:
         log.error('Invalid YAML data: {}'.format(e))
@@ -52,6 +109,106 @@ def read_yaml_string(data):
     return None
 
 
+def read_json_file(file_name, **kwargs):
+    """
+    Read a file as JSON
+
+    Keyword arguments for other parser backends are ignored.
+
+    :return: parsed JSON data, or None on error
+    """
+
+    import json
+
+    try:
+        with open(file_name, 'r') as file_object:
+            return json.load(file_object)
+
+    except ValueError as e:
+        log.error('Invalid JSON data: {}'.format(e))
+
+    return None
+
+
+def read_json_string(data, **kwargs):
+    """
+    Read a string as JSON
+
+    Keyword arguments for other parser backends are ignored.
+
+    :return: parsed JSON data, or None on error
+    """
+
+    import json
+
+    try:
+        return json.loads(data)
+
+    except ValueError as e:
+        log.error('Invalid JSON data: {}'.format(e))
+
+    return None
+
+
+ParserBackend = namedtuple('ParserBackend', ['name', 'read_file', 'read_string', 'extension_list'])
+
+PARSER_BACKEND_YAML = 'yaml'
+PARSER_BACKEND_JSON = 'json'
+
+_parser_backend_map = OrderedDict()
+_parser_extension_map = {}
+
+
+def register_parser_backend(name, read_file, read_string, extension_list = None):
+    """
+    Register a parser backend used to read config files and strings
+
+    The read functions are called with the file name or string, and keyword arguments for parser specific options
+    (currently only yaml_loader) which should be ignored if not used. They should return the parsed data, or None on
+    error. Files with a name ending in one of the extensions will be read using the backend by default.
+
+    :param name: backend name
+    :param read_file: function to read a file
+    :param read_string: function to read a string
+    :param extension_list: optional list of file name extensions, including the leading '.'
+    :return: registered backend
+    """
+
+    backend = ParserBackend(name, read_file, read_string, tuple(extension_list or ()))
+    _parser_backend_map[name] = backend
+    for extension in backend.extension_list:
+        _parser_extension_map[extension.lower()] = name
+
+    return backend
+
+
+def get_parser_backend(name = None, file_name = None):
+    """
+    Return a registered parser backend
+
+    If no name is given, the backend is chosen by the file name extension, otherwise YAML is used.
+
+    :param name: optional backend name
+    :param file_name: optional file name
+    :return: parser backend
+    :raises ValueError: if the backend name is not registered
+    """
+
+    if name is None:
+        extension = os.path.splitext(file_name)[1].lower() if file_name else ''
+        name = _parser_extension_map.get(extension, PARSER_BACKEND_YAML)
+
+    try:
+        return _parser_backend_map[name]
+
+    except KeyError:
+        raise ValueError("Unknown parser backend: '{}'".format(name))
+
+
+register_parser_backend(PARSER_BACKEND_YAML, read_yaml_file, read_yaml_string, ['.yml', '.yaml'])
+register_parser_backend(PARSER_BACKEND_JSON, read_json_file, read_json_string, ['.json'])
+
+
 def get_path_names(file_name, path_list):
     """
     Return a list of absolute file path
@@ -66,3 +223,168 @@ def get_path_names(file_name, path_list):
         return [file_name]
 
     return [os.path.join(path, file_name) for path in path_list]
+
+
+def get_file_id(file_name):
+    """
+    Return a value identifying the current version of a file
+
+    :return: tuple of the file modification time, size and inode, or None if the file does not exist
+    """
+
+    try:
+        stat = os.stat(file_name)
+
+    except OSError:
+        return None
+
+    return stat.st_mtime, stat.st_size, stat.st_ino
+
+
+class PathIndex(object):
+    """
+    Index of the names in directories, to find files without trying to open each possible path
+
+    Each directory is listed once. If validate is set, the directory modification time is checked on each lookup and
+    the directory listed again if it has changed, so the index can be kept between loads.
+    """
+
+    def __init__(self, validate = False):
+        self._validate = validate
+        self._dir_map = {}
+
+    @property
+    def validate(self):
+        return self._validate
+
+    def clear(self):
+        self._dir_map.clear()
+
+    def exists(self, file_name):
+        """
+        Return whether a file name is in the listing of its directory
+
+        :return: True or False, or None if the directory cannot be listed
+        """
+
+        dir_name, base_name = os.path.split(file_name)
+        name_set = self._get_name_set(dir_name or os.curdir)
+        if name_set is None:
+            return None
+
+        return base_name in name_set
+
+    def _get_name_set(self, dir_name):
+        entry = self._dir_map.get(dir_name)
+        if entry is not None and not self._validate:
+            return entry[1]
+
+        dir_id = None
+        if self._validate:
+            dir_id = get_file_id(dir_name)
+            if entry is not None and entry[0] == dir_id:
+                return entry[1]
+
+        try:
+            name_set = frozenset(os.listdir(dir_name))
+
+        except OSError:
+            # unable to list, e.g. the directory does not exist or is not readable
+            name_set = None
+
+        self._dir_map[dir_name] = (dir_id, name_set)
+        return name_set
+
+
+class FileDataCache(object):
+    """
+    Bounded LRU cache of parsed file data
+
+    Entries are keyed on the real path of the file and the options used to read it, and validated against the file
+    modification time, size and inode, so a changed file is parsed again. Copies of the cached data are returned so
+    callers cannot modify the cache. A single instance can be shared between Config objects, and threads, in a process.
+    """
+
+    def __init__(self, max_size = 128):
+        if max_size < 1:
+            raise ValueError('Cache size must be at least 1')
+
+        self._max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def evictions(self):
+        return self._evictions
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def read(self, file_name, read_function, read_key = None, hit_callback = None):
+        """
+        Return the data for a file from the cache, or read it and add it to the cache
+
+        :param file_name: name of the file to read
+        :param read_function: function called with the file name to read the file data if not cached
+        :param read_key: hashable value identifying the options the read function uses, as the same file read with
+            different options is cached separately
+        :param hit_callback: optional function called with the file name when the data is read from the cache
+        :return: copy of the file data
+        """
+
+        path = os.path.realpath(file_name)
+        file_id = get_file_id(path)
+        cache_key = (path, read_key)
+        if file_id is None:
+            # let the read function raise the appropriate error
+            return read_function(file_name)
+
+        with self._lock:
+            entry = self._data.pop(cache_key, None)
+            if entry is not None and entry[0] == file_id:
+                self._data[cache_key] = entry
+                self._hits += 1
+
+            else:
+                entry = None
+                self._misses += 1
+
+        if entry is not None:
+            file_data = deepcopy(entry[1])
+            if hit_callback is not None:
+                hit_callback(file_name)
+
+            return file_data
+
+        file_data = read_function(file_name)
+
+        with self._lock:
+            self._data.pop(cache_key, None)
+            self._data[cache_key] = (file_id, file_data)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last = False)
+                self._evictions += 1
+
+        return deepcopy(file_data)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("'{}' object is read only".format(type(self).__name__))
+
+
+class FrozenDict(dict):
+    """
+    Read only dict
+
+    Can be used anywhere a dict is read. Methods that would modify it raise TypeError. Hashable if the values are.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, dict.__repr__(self))
+
+
+class FrozenList(list):
+    """
+    Read only list
+
+    Can be used anywhere a list is read. Methods that would modify it raise TypeError. Hashable if the values are.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __setslice__ = __delslice__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, list.__repr__(self))
+
+
+def freeze(data):
+    """
+    Return a read only copy of config data, with nested dicts and lists also read only
+
+    Frozen data can be shared, e.g. the same defaults passed to many Config objects, without being copied. Values that
+    are already frozen are returned as they are.
+
+    :param data: value to freeze
+    :return: FrozenDict, FrozenList, or the value if it is not a dict or list
+    """
+
+    if isinstance(data, (FrozenDict, FrozenList)):
+        return data
+
+    if isinstance(data, dict):
+        return FrozenDict((key, freeze(value)) for key, value in data.items())
+
+    if isinstance(data, list):
+        return FrozenList(freeze(value) for value in data)
+
+    return data
+
+
+class FrozenConfig(FrozenDict):
+    """
+    Read only snapshot of the expanded values of a config, returned by Config.freeze
+
+    Values are looked up directly in the underlying dict, so it is as fast as a dict to read, and as it can't change it
+    can be shared between threads without locking. To change the config in use, assign a new snapshot.
+    """
+
+    __slots__ = ('_sources', '_hash')
+
+    def __init__(self, data, sources = None):
+        super(FrozenConfig, self).__init__(data)
+        self._sources = sources or ''
+        self._hash = None
+
+    @property
+    def sources(self):
+        return self._sources
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = super(FrozenConfig, self).__hash__()
+
+        return self._hash
+
+    def __reduce__(self):
+        return self.__class__, (dict(self), self._sources)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+import binascii
+import os
+import threading
+import logging
+
+try:
+    import fcntl
+
+except ImportError:
+    fcntl = None
+
+
+log = logging.getLogger('configmate.generated')
+
+
+GENERATED_FILE_MODE = 0o644
+
+
+def generate_uuid():
+    import uuid
+
+    return '{}'.format(uuid.uuid4())
+
+
+def generate_token():
+    return binascii.hexlify(os.urandom(16)).decode('ascii')
+
+
+def generate_timestamp():
+    from datetime import datetime
+
+    return datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+_generator_map = {
+    'uuid': generate_uuid,
+    'token': generate_token,
+    'timestamp': generate_timestamp,
+}
+
+
+def register_generator(name, function):
+    """
+    Register a function to generate values for ${name()} expressions
+
+    :param name: generator name
+    :param function: function called without arguments to return a new value
+    """
+
+    _generator_map[name] = function
+
+
+def get_generator(name):
+    """
+    Return a registered generator function
+
+    :raises ValueError: if the generator name is not registered
+    """
+
+    try:
+        return _generator_map[name]
+
+    except KeyError:
+        raise ValueError("Unknown generator: '{}'".format(name))
+
+
+class GeneratedValueStore(object):
+    """
+    Values generated by expressions, generated once for each generator name and label
+
+    If a file name is given, values are saved to the file so they are the same after a restart or in other processes
+    using the same file. Where available, the file is locked while new values are added.
+    """
+
+    def __init__(self, file_name = None):
+        self._file_name = file_name
+        self._value_map = {}
+        self._lock = threading.Lock()
+
+    @property
+    def file_name(self):
+        return self._file_name
+
+    def __len__(self):
+        return len(self._value_map)
+
+    def get(self, name, label):
+        """
+        Return the generated value for a generator name and label, generating it if needed
+        """
+
+        key = '{}:{}'.format(name, label)
+        try:
+            return self._value_map[key]
+
+        except KeyError:
+            pass
+
+        generator = get_generator(name)
+
+        with self._lock:
+            if self._file_name is None:
+                return self._value_map.setdefault(key, generator())
+
+            with _FileLock(self._file_name + '.lock'):
+                self._value_map.update(self._read_file())
+                if key not in self._value_map:
+                    self._value_map[key] = generator()
+                    self._write_file()
+
+            return self._value_map[key]
+
+    def _read_file(self):
+        import json
+
+        try:
+            with open(self._file_name, 'r') as file_object:
+                value_map = json.load(file_object)
+
+        except IOError:
+            return {}
+
+        except ValueError as e:
+            log.error('Invalid generated value data: {}'.format(e))
+            return {}
+
+        if not isinstance(value_map, dict):
+            log.error('Invalid generated value data: {}'.format(self._file_name))
+            return {}
+
+        return value_map
+
+    def _write_file(self):
+        import json
+        from tempfile import mkstemp
+
+        dir_name = os.path.dirname(os.path.abspath(self._file_name))
+        file_descriptor, temp_file_name = mkstemp(prefix = '.configmate', dir = dir_name)
+        try:
+            with os.fdopen(file_descriptor, 'w') as file_object:
+                json.dump(self._value_map, file_object, indent = 2, sort_keys = True)
+
+            os.chmod(temp_file_name, GENERATED_FILE_MODE)
+            os.rename(temp_file_name, self._file_name)
+
+        except Exception:
+            os.remove(temp_file_name)
+            raise
+
+
+class _FileLock(object):
+    """
+    Exclusive lock on a file, shared between processes where supported
+    """
+
+    def __init__(self, file_name):
+        self._file_name = file_name
+        self._file_object = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file_object = open(self._file_name, 'a')
+            fcntl.flock(self._file_object, fcntl.LOCK_EX)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._file_object is not None:
+            fcntl.flock(self._file_object, fcntl.LOCK_UN)
+            self._file_object.close()
+            self._file_object = None
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+from collections import Mapping
+from .merge import ConfigMerger, MERGE_REPLACE, get_merge_type
+
+
+LAYER_DEFAULTS_NAME = '<defaults>'
+LAYER_OVERRIDE_NAME = '<runtime>'
+
+# stored in the override layer for deleted keys
+_DELETED = object()
+
+# returned by get_override for keys that are not in the override layer
+_NOT_OVERRIDDEN = object()
+
+
+class LayeredConfig(Mapping):
+    """
+    Config values stored as a stack of layers, in the order they were loaded, with runtime changes on top
+
+    Values are looked up through the layers from the top. Where the merge strategy for a key combines values, the values
+    from each layer are merged when the key is first read, and the result kept until the layers change. Values set at
+    runtime replace the loaded values.
+    """
+
+    def __init__(self, merge_strategy = MERGE_REPLACE, merge_strategy_map = None):
+        self._merge_strategy = merge_strategy
+        self._merge_strategy_map = merge_strategy_map
+        self._merger = ConfigMerger(merge_strategy, merge_strategy_map)
+        # list of tuples of layer name and data
+        self._layer_list = []
+        self._override_map = {}
+        self._value_cache = {}
+        self._key_set = None
+
+    @property
+    def layer_list(self):
+        return self._layer_list
+
+    def add_layer(self, data, name):
+        self._layer_list.append((name, data))
+        self._value_cache.clear()
+        self._key_set = None
+
+    def copy(self):
+        layered_config = self.__class__(self._merge_strategy, self._merge_strategy_map)
+        layered_config._layer_list = list(self._layer_list)
+        layered_config._override_map = dict(self._override_map)
+        return layered_config
+
+    def get_value_list(self, key):
+        """
+        Return the values combined to give the value of a key, from the top layer down
+
+        :return: list of values, empty if the key is not set
+        """
+
+        return [value for _, value in self._get_layer_value_list(key)]
+
+    def get_sources(self, key):
+        """
+        Return the names of the layers the value of a key comes from, from the top layer down
+
+        :return: list of layer names, empty if the key is not set
+        """
+
+        return [name for name, _ in self._get_layer_value_list(key)]
+
+    def get_override(self, key):
+        """
+        Return the state of a key in the override layer, to restore with restore_override
+        """
+
+        return self._override_map.get(key, _NOT_OVERRIDDEN)
+
+    def restore_override(self, key, override):
+        """
+        Restore the state of a key in the override layer returned by get_override
+        """
+
+        if override is _NOT_OVERRIDDEN:
+            self._override_map.pop(key, None)
+
+        else:
+            self._override_map[key] = override
+
+        self._value_cache.pop(key, None)
+        self._key_set = None
+
+    def _get_layer_value_list(self, key):
+        if key in self._override_map:
+            value = self._override_map[key]
+            return [] if value is _DELETED else [(LAYER_OVERRIDE_NAME, value)]
+
+        layer_value_list = []
+        top_type = None
+        for name, data in reversed(self._layer_list):
+            if key in data:
+                value = data[key]
+                if top_type is None:
+                    top_type = get_merge_type(value)
+
+                elif get_merge_type(value) is not top_type:
+                    # replaced by the values above
+                    break
+
+                layer_value_list.append((name, value))
+                if not self._merger.is_combined(key, value):
+                    break
+
+        return layer_value_list
+
+    def __getitem__(self, key):
+        try:
+            return self._value_cache[key]
+
+        except KeyError:
+            pass
+
+        value_list = self.get_value_list(key)
+        if not value_list:
+            raise KeyError(key)
+
+        if len(value_list) == 1:
+            value = value_list[0]
+
+        else:
+            merged_data = {}
+            self._merger.reset(merged_data)
+            for value in reversed(value_list):
+                self._merger.merge(merged_data, {key: value})
+
+            value = merged_data[key]
+
+        self._value_cache[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._override_map[key] = value
+        self._value_cache.pop(key, None)
+        self._key_set = None
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+
+        self._override_map[key] = _DELETED
+        self._value_cache.pop(key, None)
+        self._key_set = None
+
+    def __contains__(self, key):
+        if key in self._override_map:
+            return self._override_map[key] is not _DELETED
+
+        return any(key in data for _, data in self._layer_list)
+
+    def _get_key_set(self):
+        if self._key_set is None:
+            key_set = set()
+            for _, data in self._layer_list:
+                key_set.update(data)
+
+            for key, value in self._override_map.items():
+                if value is _DELETED:
+                    key_set.discard(key)
+
+                else:
+                    key_set.add(key)
+
+            self._key_set = key_set
+
+        return self._key_set
+
+    def __iter__(self):
+        return iter(self._get_key_set())
+
+    def __len__(self):
+        return len(self._get_key_set())
+
+    def __repr__(self):
+        return repr(dict(self))
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+from .frozen import FrozenDict, FrozenList
+
+
+MERGE_REPLACE = 'replace'
+MERGE_DEEP = 'deep'
+MERGE_LIST_APPEND = 'list_append'
+MERGE_LIST_UNIQUE = 'list_unique'
+
+MERGE_STRATEGY_LIST = (MERGE_REPLACE, MERGE_DEEP, MERGE_LIST_APPEND, MERGE_LIST_UNIQUE)
+
+
+class ConfigMerger(object):
+    """
+    Merge config data into a dict in place, using a strategy for each key
+
+    Strategies are:
+
+    - replace: the new value replaces the current value
+    - deep: dicts are merged recursively, other values are replaced
+    - list_append: as deep, and lists are joined
+    - list_unique: as deep, and lists are joined without adding values already in the list
+
+    The strategy for a key can be set by its dotted path, e.g. 'server.hosts', and applies to the values nested below
+    it unless they have their own strategy. Other keys use the default strategy.
+    Dicts and lists that are not part of the merged result are not modified. They are copied, one level at a time,
+    when they first need to change, so the merge time depends on the size of the data being merged in.
+    """
+
+    def __init__(self, strategy = MERGE_REPLACE, strategy_map = None):
+        for path_strategy in [strategy] + list((strategy_map or {}).values()):
+            if path_strategy not in MERGE_STRATEGY_LIST:
+                raise ValueError("Unknown merge strategy: '{}'".format(path_strategy))
+
+        self._strategy = strategy
+        self._strategy_map = {tuple(path.split('.')): value for path, value in (strategy_map or {}).items()}
+        # containers created by the merge, which can be modified in place, by id
+        self._owned_map = {}
+
+    @property
+    def strategy(self):
+        return self._strategy
+
+    def is_combined(self, key, value):
+        """
+        Return whether a new value for a top level key is combined with the current value, rather than replacing it
+        """
+
+        strategy = self._strategy_map.get((key,), self._strategy)
+        if strategy == MERGE_REPLACE:
+            return False
+
+        return isinstance(value, dict) or (isinstance(value, list) and strategy != MERGE_DEEP)
+
+    def reset(self, target):
+        """
+        Start merging into a new dict, which can be modified in place
+        """
+
+        self._owned_map = {id(target): target}
+
+    def merge(self, target, source):
+        """
+        Merge a dict into the target dict
+        """
+
+        if self._strategy == MERGE_REPLACE and not self._strategy_map:
+            target.update(source)
+
+        else:
+            self._merge_dict(target, source, (), self._strategy)
+
+    def _merge_dict(self, target, source, path, parent_strategy):
+        for key, value in source.items():
+            key_path = path + (key,) if self._strategy_map else path
+            strategy = self._strategy_map.get(key_path, parent_strategy)
+            current_value = target.get(key)
+
+            if strategy == MERGE_REPLACE or get_merge_type(current_value) is not get_merge_type(value):
+                target[key] = value
+
+            elif isinstance(value, dict):
+                self._merge_dict(self._get_owned(target, key, current_value), value, key_path, strategy)
+
+            elif isinstance(value, list) and strategy != MERGE_DEEP:
+                if strategy == MERGE_LIST_UNIQUE:
+                    value = _get_unique_list(current_value, value)
+
+                self._get_owned(target, key, current_value).extend(value)
+
+            else:
+                target[key] = value
+
+    def _get_owned(self, target, key, value):
+        """
+        Return a container from the target that can be modified, copying it if needed
+        """
+
+        if id(value) not in self._owned_map:
+            value = get_merge_type(value)(value)
+            self._owned_map[id(value)] = value
+            target[key] = value
+
+        return value
+
+
+def get_merge_type(value):
+    """
+    Return the type of a value when merging, which is also the type of a modifiable copy of the value
+
+    Frozen dicts and lists are merged as dicts and lists.
+    """
+
+    if isinstance(value, FrozenDict):
+        return dict
+
+    if isinstance(value, FrozenList):
+        return list
+
+    return type(value)
+
+
+def _get_unique_list(current_list, new_list):
+    """
+    Return the values in the new list that are not in the current list, or earlier in the new list
+    """
+
+    unique_list = []
+    hashable_set = set()
+    for item in current_list:
+        try:
+            hashable_set.add(item)
+
+        except TypeError:
+            pass
+
+    for item in new_list:
+        try:
+            if item in hashable_set:
+                continue
+
+            hashable_set.add(item)
+
+        except TypeError:
+            if item in current_list or item in unique_list:
+                continue
+
+        unique_list.append(item)
+
+    return unique_list
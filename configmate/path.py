@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+
+
+PATH_SEPARATOR = '.'
+PATH_CACHE_SIZE = 4096
+
+_path_cache = {}
+
+# default for get_path_value, to raise KeyError if the path is not found
+NO_DEFAULT = object()
+
+
+class ConfigPath(object):
+    """
+    Dotted path to a value in nested dicts and lists, e.g. 'db.pool.size' or 'server.hosts.0'
+
+    The path is split once, so it can be reused to read the same value from a config without parsing it again.
+    """
+
+    __slots__ = ('path', 'name_list', '_level_list')
+
+    def __init__(self, path):
+        if not path:
+            raise ValueError('Empty config path')
+
+        self.path = path
+        self.name_list = tuple(path.split(PATH_SEPARATOR))
+        # tuples of the name and the list index it refers to, if it is a number
+        self._level_list = tuple((name, int(name) if name.isdigit() else None) for name in self.name_list[1:])
+
+    def get_value(self, value):
+        """
+        Return the value the path refers to, starting from the value of the first name in the path
+
+        :param value: value of the first name in the path
+        :return: value
+        :raises KeyError: if the path is not found, naming the first missing part of the path
+        """
+
+        top_value = value
+        try:
+            for name, index in self._level_list:
+                value = value[index if index is not None and isinstance(value, list) else name]
+
+        except (KeyError, IndexError, TypeError):
+            raise self.missing_exception(self._get_found_count(top_value) + 1)
+
+        return value
+
+    def _get_found_count(self, value):
+        """
+        Return the number of names in the path that are found, starting from the value of the first name
+        """
+
+        for level, (name, index) in enumerate(self._level_list):
+            try:
+                value = value[index if index is not None and isinstance(value, list) else name]
+
+            except (KeyError, IndexError, TypeError):
+                return level + 1
+
+        return len(self.name_list)
+
+    def missing_exception(self, name_count):
+        """
+        Return the exception for a path where the value of the first names in the path can't be found
+
+        :param name_count: number of names in the path to the missing value
+        """
+
+        return KeyError(
+            "Config path not found: '{}' in '{}'".format(PATH_SEPARATOR.join(self.name_list[:name_count]), self.path)
+        )
+
+    def __call__(self, config, *args):
+        """
+        Return the value at the path in a config, or the default if given and the path is not found
+        """
+
+        return config.get_path(self, *args)
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.path)
+
+
+def compile_path(path):
+    """
+    Return a ConfigPath for a dotted path, cached by path string
+    """
+
+    if isinstance(path, ConfigPath):
+        return path
+
+    try:
+        return _path_cache[path]
+
+    except KeyError:
+        pass
+
+    if len(_path_cache) >= PATH_CACHE_SIZE:
+        _path_cache.clear()
+
+    config_path = ConfigPath(path)
+    _path_cache[path] = config_path
+    return config_path
+
+
+def get_path_value(mapping, path, default = NO_DEFAULT):
+    """
+    Return the value at a dotted path in a mapping of top level keys to values, e.g. a config
+
+    :param mapping: mapping the first name in the path is looked up in
+    :param path: dotted path string or ConfigPath
+    :param default: value returned if the path is not found
+    :return: value
+    :raises KeyError: if the path is not found and there is no default, naming the first missing part of the path
+    :raises ValueError: if the path is invalid
+    """
+
+    config_path = compile_path(path)
+    try:
+        try:
+            top_value = mapping[config_path.name_list[0]]
+
+        except KeyError:
+            raise config_path.missing_exception(1)
+
+        return config_path.get_value(top_value)
+
+    except KeyError:
+        if default is NO_DEFAULT:
+            raise
+
+        return default
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+import re
+from .expression import string_types, text_type
+
+
+try:
+    integer_types = (int, long)  # noqa: F821
+
+except NameError:
+    integer_types = (int,)
+
+
+_quantity_regex = re.compile(r'^\s*([0-9]*\.?[0-9]+)\s*([A-Za-z]*)\s*$')
+
+_duration_unit_map = {
+    '': 1,
+    'ms': 0.001,
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60,
+}
+
+_size_unit_map = {
+    '': 1,
+    'b': 1,
+}
+_size_unit_map.update(
+    (prefix + suffix, 1024 ** power)
+    for power, prefix in enumerate(('k', 'm', 'g', 't'), 1)
+    for suffix in ('', 'b', 'ib')
+)
+
+# returned by validators in place of a value that is not valid
+_INVALID = object()
+
+
+def _parse_quantity(value, unit_map, description):
+    if isinstance(value, integer_types + (float,)) and not isinstance(value, bool):
+        return value, 1
+
+    match = _quantity_regex.match(value) if isinstance(value, string_types) else None
+    if match is None or match.group(2).lower() not in unit_map:
+        raise ValueError("Invalid {}: '{}'".format(description, value))
+
+    return float(match.group(1)), unit_map[match.group(2).lower()]
+
+
+def parse_duration(value):
+    """
+    Convert a duration such as '30s' to seconds
+
+    Units are ms, s, m, h and d. A number without a unit is in seconds.
+
+    :return: float number of seconds
+    :raises ValueError: if the value is not a valid duration
+    """
+
+    number, multiplier = _parse_quantity(value, _duration_unit_map, 'duration')
+    return float(number * multiplier)
+
+
+def parse_size(value):
+    """
+    Convert a size such as '512MB' to bytes
+
+    Units are B, KB, MB, GB and TB, which are multiples of 1024, and can also be written as K or KiB etc. A number
+    without a unit is in bytes.
+
+    :return: integer number of bytes
+    :raises ValueError: if the value is not a valid size
+    """
+
+    number, multiplier = _parse_quantity(value, _size_unit_map, 'size')
+    return int(number * multiplier)
+
+
+class Field(object):
+    """
+    Schema for a config value
+
+    The value type is one of:
+
+    - a type, such as int or str, which the value must be an instance of. Integers are accepted for float, and are
+      converted to float
+    - a function to convert the value, such as parse_duration, which raises ValueError or TypeError if the value is not
+      valid
+    - a dict of schemas for the keys of a nested dict
+    - a list containing the schema for each item of a nested list
+
+    Minimum and maximum apply to numbers, and to the length of strings, lists and dicts.
+    """
+
+    def __init__(self, value_type, required = False, minimum = None, maximum = None, choices = None):
+        self.value_type = value_type
+        self.required = required
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+
+
+class Schema(object):
+    """
+    Schema for config values, compiled once to functions that check and convert the values
+
+    The schema is a dict of key to Field, or to a value type as accepted by Field. Keys that are not in the schema are
+    not checked.
+    """
+
+    def __init__(self, spec):
+        if not isinstance(spec, dict):
+            raise ValueError('Config schema must be a dict')
+
+        self._spec = spec
+        self._item_validator_list = _compile_item_validator_list(spec)
+        self._validator_map = {key: validator for key, _, validator in self._item_validator_list}
+
+    @property
+    def spec(self):
+        return self._spec
+
+    def validate(self, data):
+        """
+        Check and convert values, collecting all the errors
+
+        :param data: mapping of config values
+        :return: tuple of dict of the converted values that changed by key, and list of error messages
+        """
+
+        error_list = []
+        changed_map = _validate_items(self._item_validator_list, data, '', error_list)
+        return changed_map, error_list
+
+    def validate_value(self, key, value):
+        """
+        Check and convert the value of a top level key
+
+        :return: tuple of the converted value, or the value if it is not valid, and list of error messages
+        """
+
+        validator = self._validator_map.get(key)
+        if validator is None:
+            return value, []
+
+        error_list = []
+        new_value = validator(value, _get_path('', key), error_list)
+        return value if new_value is _INVALID else new_value, error_list
+
+    def get_missing_errors(self, data):
+        """
+        Return the error messages for the required keys that are not in the data
+        """
+
+        return [
+            "'{}' is required".format(_get_path('', key))
+            for key, required, _ in self._item_validator_list
+            if required and key not in data
+        ]
+
+    def __reduce__(self):
+        return self.__class__, (self._spec,)
+
+
+def _get_path(path, key):
+    return '{}.{}'.format(path, key) if path else text_type(key)
+
+
+def _validate_items(item_validator_list, data, path, error_list):
+    changed_map = {}
+    for key, required, validator in item_validator_list:
+        if key not in data:
+            if required:
+                error_list.append("'{}' is required".format(_get_path(path, key)))
+
+            continue
+
+        value = data[key]
+        new_value = validator(value, _get_path(path, key), error_list)
+        if new_value is not _INVALID and new_value is not value:
+            changed_map[key] = new_value
+
+    return changed_map
+
+
+def _compile_item_validator_list(spec):
+    return [
+        (key, isinstance(item_spec, Field) and item_spec.required, _compile(item_spec))
+        for key, item_spec in spec.items()
+    ]
+
+
+def _compile(spec):
+    """
+    Return a validator function for a schema, called with the value, the path for errors and the list of errors
+
+    The validator returns the value, converted if needed, or _INVALID if it is not valid.
+    """
+
+    if isinstance(spec, Field):
+        return _compile_field(spec)
+
+    return _compile_type(spec)
+
+
+def _compile_field(field):
+    type_validator = _compile_type(field.value_type)
+    minimum = field.minimum
+    maximum = field.maximum
+    choices = field.choices
+
+    if minimum is None and maximum is None and choices is None:
+        return type_validator
+
+    def validate_field(value, path, error_list):
+        value = type_validator(value, path, error_list)
+        if value is _INVALID:
+            return value
+
+        size = len(value) if isinstance(value, string_types + (list, dict)) else value
+        if minimum is not None and size < minimum:
+            error_list.append("'{}' must be at least {}".format(path, minimum))
+            return _INVALID
+
+        if maximum is not None and size > maximum:
+            error_list.append("'{}' must be at most {}".format(path, maximum))
+            return _INVALID
+
+        if choices is not None and value not in choices:
+            error_list.append("'{}' must be one of {}".format(path, ', '.join(text_type(choice) for choice in choices)))
+            return _INVALID
+
+        return value
+
+    return validate_field
+
+
+def _compile_type(value_type):
+    if isinstance(value_type, dict):
+        return _compile_dict(value_type)
+
+    if isinstance(value_type, list):
+        if len(value_type) != 1:
+            raise ValueError('Config schema for a list must contain one item schema')
+
+        return _compile_list(_compile(value_type[0]))
+
+    if value_type in string_types + (str, text_type):
+        return _compile_instance_check(string_types, 'a string')
+
+    if value_type is bool:
+        return _compile_instance_check(bool, 'a boolean')
+
+    if value_type is int:
+        return _compile_instance_check(integer_types, 'an integer')
+
+    if value_type is float:
+        return _compile_float()
+
+    if isinstance(value_type, type):
+        return _compile_instance_check(value_type, "of type '{}'".format(value_type.__name__))
+
+    if callable(value_type):
+        return _compile_conversion(value_type)
+
+    raise ValueError('Invalid config schema type: {!r}'.format(value_type))
+
+
+def _compile_instance_check(value_type, description):
+    def validate_instance(value, path, error_list):
+        # bool is a subclass of int, but is not accepted as a number
+        if isinstance(value, value_type) and (value_type is bool or not isinstance(value, bool)):
+            return value
+
+        error_list.append("'{}' must be {}".format(path, description))
+        return _INVALID
+
+    return validate_instance
+
+
+def _compile_float():
+    def validate_float(value, path, error_list):
+        if isinstance(value, float):
+            return value
+
+        if isinstance(value, integer_types) and not isinstance(value, bool):
+            return float(value)
+
+        error_list.append("'{}' must be a number".format(path))
+        return _INVALID
+
+    return validate_float
+
+
+def _compile_conversion(convert):
+    def validate_conversion(value, path, error_list):
+        try:
+            return convert(value)
+
+        except (TypeError, ValueError) as e:
+            error_list.append("'{}': {}".format(path, e))
+            return _INVALID
+
+    return validate_conversion
+
+
+def _compile_dict(spec):
+    item_validator_list = _compile_item_validator_list(spec)
+
+    def validate_dict(value, path, error_list):
+        if not isinstance(value, dict):
+            error_list.append("'{}' must be a dict".format(path))
+            return _INVALID
+
+        changed_map = _validate_items(item_validator_list, value, path, error_list)
+        if changed_map:
+            value = dict(value)
+            value.update(changed_map)
+
+        return value
+
+    return validate_dict
+
+
+def _compile_list(item_validator):
+    def validate_list(value, path, error_list):
+        if not isinstance(value, list):
+            error_list.append("'{}' must be a list".format(path))
+            return _INVALID
+
+        new_value = [item_validator(item, _get_path(path, index), error_list) for index, item in enumerate(value)]
+        if any(new_item is not item and new_item is not _INVALID for new_item, item in zip(new_value, value)):
+            return [item if new_item is _INVALID else new_item for new_item, item in zip(new_value, value)]
+
+        return value
+
+    return validate_list
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+from collections import Mapping
+import mmap
+import os
+import struct
+from .config import ConfigException, ConfigLoadException
+from .path import get_path_value, NO_DEFAULT
+from .snapshot import import_pickle
+import logging
+
+
+log = logging.getLogger('configmate.shared')
+
+
+SHARED_VERSION = 1
+SHARED_FILE_MODE = 0o644
+
+# attempts to attach to the current data file, which may be replaced while it is being opened
+ATTACH_ATTEMPT_COUNT = 5
+
+# control file: magic, version, generation
+_CONTROL_HEADER = struct.Struct(str('<4sIQ'))
+_CONTROL_MAGIC = b'CMSC'
+_GENERATION_OFFSET = 8
+
+# data file: magic, version, generation, index offset and index length, followed by the pickled values and index
+_DATA_HEADER = struct.Struct(str('<4sIQQQ'))
+_DATA_MAGIC = b'CMSD'
+
+
+def get_data_file_name(file_name, generation):
+    return '{}.{}'.format(file_name, generation)
+
+
+def _read_generation(file_name):
+    """
+    Return the generation in a control file, or 0 if the file is missing or invalid
+    """
+
+    try:
+        with open(file_name, 'rb') as file_object:
+            magic, version, generation = _CONTROL_HEADER.unpack(file_object.read(_CONTROL_HEADER.size))
+
+    except (IOError, OSError, struct.error):
+        return 0
+
+    return generation if magic == _CONTROL_MAGIC and version == SHARED_VERSION else 0
+
+
+def _write_file(file_name, data):
+    """
+    Write a file in one step, by writing a temporary file which is then renamed
+    """
+
+    from tempfile import mkstemp
+
+    dir_name = os.path.dirname(os.path.abspath(file_name))
+    file_descriptor, temp_file_name = mkstemp(prefix = '.configmate', dir = dir_name)
+    try:
+        with os.fdopen(file_descriptor, 'wb') as file_object:
+            file_object.write(data)
+
+        os.chmod(temp_file_name, SHARED_FILE_MODE)
+        os.rename(temp_file_name, file_name)
+
+    except Exception:
+        os.remove(temp_file_name)
+        raise
+
+
+def _encode(generation, config_data, sources):
+    """
+    Return config data in the data file format
+
+    Each value is pickled separately, so it can be read without reading the other values. The index maps each key to
+    the offset and length of its value.
+    """
+
+    pickle = import_pickle()
+    value_list = []
+    index = {}
+    offset = _DATA_HEADER.size
+    for key, value in config_data.items():
+        value_data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        value_list.append(value_data)
+        index[key] = (offset, len(value_data))
+        offset += len(value_data)
+
+    index_data = pickle.dumps((sources, index), pickle.HIGHEST_PROTOCOL)
+    value_list.insert(0, _DATA_HEADER.pack(_DATA_MAGIC, SHARED_VERSION, generation, offset, len(index_data)))
+    value_list.append(index_data)
+    return b''.join(value_list)
+
+
+def write_shared(file_name, config_data, sources = ''):
+    """
+    Publish config data for SharedConfig readers, as the next generation
+
+    The data is written to a new data file, then the generation in the control file is updated, so readers never see a
+    partially written config. The data file of the previous generation is removed, which doesn't affect readers that
+    are still attached to it.
+
+    :param file_name: control file name, data files are named after it with the generation added
+    :param config_data: dict of top level keys to values, which are pickled
+    :param sources: description of the config sources
+    :return: generation
+    """
+
+    previous_generation = _read_generation(file_name)
+    generation = previous_generation + 1
+    _write_file(get_data_file_name(file_name, generation), _encode(generation, config_data, sources))
+
+    control_data = _CONTROL_HEADER.pack(_CONTROL_MAGIC, SHARED_VERSION, generation)
+    if previous_generation:
+        # update the generation in place, so readers that have mapped the control file see it
+        with open(file_name, 'r+b') as file_object:
+            file_object.write(control_data)
+
+        try:
+            os.remove(get_data_file_name(file_name, previous_generation))
+
+        except OSError as e:
+            log.warning('Unable to remove shared config data: {}'.format(e))
+
+    else:
+        _write_file(file_name, control_data)
+
+    return generation
+
+
+def _map_file(file_name):
+    with open(file_name, 'rb') as file_object:
+        return mmap.mmap(file_object.fileno(), 0, access = mmap.ACCESS_READ)
+
+
+class _SharedData(object):
+    """
+    A mapped data file, with the values read from it so far
+    """
+
+    def __init__(self, file_name, generation):
+        pickle = import_pickle()
+        self.data = _map_file(file_name)
+        magic, version, self.generation, index_offset, index_length = _DATA_HEADER.unpack_from(self.data)
+        if magic != _DATA_MAGIC or version != SHARED_VERSION or self.generation != generation:
+            raise ValueError('Invalid shared config data: {}'.format(file_name))
+
+        self.sources, self.index = pickle.loads(self.data[index_offset:index_offset + index_length])
+        self.value_cache = {}
+
+
+class SharedConfig(Mapping):
+    """
+    Read only view of config data published by Config.publish_shared, e.g. by the parent of pre-forked workers
+
+    The data is mapped into memory, so it is shared by every process that reads it, and each value is only unpickled
+    when it is first read. Nested dicts and lists are read only. Call refresh to use the latest generation published.
+    """
+
+    def __init__(self, file_name):
+        self._file_name = file_name
+        try:
+            self._control = _map_file(file_name)
+
+        except (IOError, OSError, ValueError) as e:
+            raise ConfigLoadException("Unable to load shared config: '{}': {}".format(file_name, e))
+
+        self._shared_data = self._attach()
+
+    def _read_generation(self):
+        return struct.unpack_from(str('<Q'), self._control, _GENERATION_OFFSET)[0]
+
+    def _attach(self):
+        error = None
+        for _ in range(ATTACH_ATTEMPT_COUNT):
+            generation = self._read_generation()
+            try:
+                return _SharedData(get_data_file_name(self._file_name, generation), generation)
+
+            except (IOError, OSError, ValueError, struct.error) as e:
+                # the data file may have been replaced by a later generation
+                error = e
+
+        raise ConfigLoadException("Unable to load shared config: '{}': {}".format(self._file_name, error))
+
+    @property
+    def generation(self):
+        return self._shared_data.generation
+
+    @property
+    def sources(self):
+        return self._shared_data.sources
+
+    def refresh(self):
+        """
+        Use the latest generation of the config, if a new one has been published
+
+        This reads the generation from the mapped control file, so is cheap to call often, e.g. for each request.
+
+        :return: True if the config changed
+        """
+
+        if self._read_generation() == self._shared_data.generation:
+            return False
+
+        self._shared_data = self._attach()
+        return True
+
+    def get_path(self, path, default = NO_DEFAULT):
+        """
+        Return the value at a dotted path, as Config.get_path
+        """
+
+        try:
+            return get_path_value(self, path, default)
+
+        except ValueError as e:
+            raise ConfigException(str(e))
+
+    def __getitem__(self, key):
+        shared_data = self._shared_data
+        try:
+            return shared_data.value_cache[key]
+
+        except KeyError:
+            pass
+
+        try:
+            offset, length = shared_data.index[key]
+
+        except KeyError:
+            raise KeyError("'" + key + "'")
+
+        value = import_pickle().loads(shared_data.data[offset:offset + length])
+        shared_data.value_cache[key] = value
+        return value
+
+    def __iter__(self):
+        return iter(self._shared_data.index)
+
+    def __len__(self):
+        return len(self._shared_data.index)
+
+    def __contains__(self, key):
+        return key in self._shared_data.index
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self._file_name)
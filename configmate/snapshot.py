@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+import os
+import logging
+
+
+log = logging.getLogger('configmate.snapshot')
+
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FILE_MODE = 0o644
+
+
+def import_pickle():
+    """
+    Return the fastest pickle module available
+    """
+
+    try:
+        import cPickle as pickle
+
+    except ImportError:
+        import pickle
+
+    return pickle
+
+
+def write_snapshot(file_name, snapshot_data):
+    """
+    Write snapshot data to a file
+
+    The data is written to a temporary file which is then renamed, so readers never see a partially written snapshot.
+
+    :raises ValueError: if the data can't be pickled
+    """
+
+    from tempfile import mkstemp
+
+    pickle = import_pickle()
+    try:
+        file_data = pickle.dumps((SNAPSHOT_VERSION, snapshot_data), pickle.HIGHEST_PROTOCOL)
+
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        raise ValueError('Unable to pickle config snapshot: {}'.format(e))
+
+    dir_name = os.path.dirname(os.path.abspath(file_name))
+    file_descriptor, temp_file_name = mkstemp(prefix = '.configmate', dir = dir_name)
+    try:
+        with os.fdopen(file_descriptor, 'wb') as file_object:
+            file_object.write(file_data)
+
+        os.chmod(temp_file_name, SNAPSHOT_FILE_MODE)
+        os.rename(temp_file_name, file_name)
+
+    except Exception:
+        os.remove(temp_file_name)
+        raise
+
+
+def read_snapshot(file_name):
+    """
+    Read snapshot data from a file
+
+    Snapshots are pickled, so should only be read from trusted locations.
+
+    :return: snapshot data, or None if the file is missing, invalid or written by a different snapshot version
+    """
+
+    pickle = import_pickle()
+    try:
+        with open(file_name, 'rb') as file_object:
+            snapshot_version, snapshot_data = pickle.load(file_object)
+
+    except IOError:
+        return None
+
+    except Exception as e:
+        log.error('Invalid snapshot data: {}'.format(e))
+        return None
+
+    if snapshot_version != SNAPSHOT_VERSION:
+        log.warning('Ignoring snapshot version {}: {}'.format(snapshot_version, file_name))
+        return None
+
+    return snapshot_data
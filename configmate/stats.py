@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+from collections import namedtuple, OrderedDict
+import threading
+import time
+
+
+PHASE_LOAD = 'load'
+PHASE_RESOLVE = 'resolve'
+PHASE_READ = 'read'
+PHASE_PARSE = 'parse'
+PHASE_MERGE = 'merge'
+PHASE_VALIDATE = 'validate'
+
+PHASE_LIST = (PHASE_LOAD, PHASE_RESOLVE, PHASE_READ, PHASE_PARSE, PHASE_MERGE, PHASE_VALIDATE)
+
+# a timed phase of loading a config, passed to the trace callback
+LoadSpan = namedtuple('LoadSpan', ['phase', 'name', 'start_time', 'duration', 'attributes'])
+
+
+# the current time in seconds, from the timer used for load spans
+get_timer = getattr(time, 'perf_counter', time.time)
+
+
+class FileLoadStats(object):
+    """
+    Time spent in each phase of loading a config file
+
+    Attributes recorded with the spans include byte_count for files parsed, cached for whether the file was last read
+    from the cache, found for files that were checked but not found, and depth for the include depth of the file.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.phase_time_map = {}
+        self.attributes = {}
+
+    @property
+    def total_time(self):
+        return sum(self.phase_time_map.values())
+
+    @property
+    def found(self):
+        return self.attributes.get('found', True)
+
+    @property
+    def cached(self):
+        return self.attributes.get('cached', False)
+
+    @property
+    def byte_count(self):
+        return self.attributes.get('byte_count')
+
+    @property
+    def depth(self):
+        return self.attributes.get('depth')
+
+
+class LoadStats(object):
+    """
+    Record the time spent in each phase of loading a config, for each file
+
+    Phases are resolve (checking for files that are not found), read (reading parsed data from the cache), parse
+    (reading and parsing a file with the parser backend), merge, validate, and load for the whole config. Pass an
+    instance as the instrument option of Config to record more than one load, or to set a callback which is called
+    with a LoadSpan for each phase as it ends.
+    """
+
+    def __init__(self, trace_callback = None):
+        self._trace_callback = trace_callback
+        self._lock = threading.Lock()
+        self._file_map = OrderedDict()
+        self._phase_time_map = {}
+        self._cache_hit_count = 0
+
+    def add_span(self, phase, name, start_time, **attributes):
+        """
+        Record a phase that started at the given time and has just ended
+
+        :param name: file name, or None for a phase of the whole config
+        :param start_time: start time from get_timer
+        :param attributes: values recorded for the file
+        :return: end time
+        """
+
+        end_time = get_timer()
+        duration = end_time - start_time
+        with self._lock:
+            self._phase_time_map[phase] = self._phase_time_map.get(phase, 0.0) + duration
+            if attributes.get('cached'):
+                self._cache_hit_count += 1
+
+            if name is not None:
+                file_stats = self._file_map.get(name)
+                if file_stats is None:
+                    file_stats = self._file_map[name] = FileLoadStats(name)
+
+                file_stats.phase_time_map[phase] = file_stats.phase_time_map.get(phase, 0.0) + duration
+                file_stats.attributes.update(attributes)
+
+        if self._trace_callback is not None:
+            self._trace_callback(LoadSpan(phase, name, start_time, duration, attributes))
+
+        return end_time
+
+    @property
+    def files(self):
+        """
+        Stats for each file, in the order the files were checked
+
+        :return: list of FileLoadStats
+        """
+
+        return list(self._file_map.values())
+
+    @property
+    def cache_hits(self):
+        """
+        Number of files read from the cache, counting each read
+        """
+
+        return self._cache_hit_count
+
+    @property
+    def byte_count(self):
+        return sum(file_stats.byte_count or 0 for file_stats in self._file_map.values())
+
+    def get_phase_time(self, phase):
+        """
+        Return the total time spent in a phase, in seconds
+        """
+
+        return self._phase_time_map.get(phase, 0.0)
+
+    def get_slowest_files(self, count = 5):
+        """
+        Return the stats of the files that took the longest to load, slowest first
+
+        :return: list of FileLoadStats
+        """
+
+        return sorted(
+            (file_stats for file_stats in self._file_map.values() if file_stats.found),
+            key = lambda file_stats: file_stats.total_time,
+            reverse = True
+        )[:count]
+
+    def report(self, count = 5):
+        """
+        Return a summary of the load times as text
+
+        :param count: number of the slowest files to list
+        """
+
+        line_list = [
+            'Config load: {:.1f}ms, {} files, {} bytes, {} cache hits'.format(
+                self.get_phase_time(PHASE_LOAD) * 1000,
+                sum(1 for file_stats in self._file_map.values() if file_stats.found),
+                self.byte_count,
+                self.cache_hits
+            ),
+            'Phases: {}'.format(
+                ', '.join(
+                    '{} {:.1f}ms'.format(phase, self.get_phase_time(phase) * 1000)
+                    for phase in PHASE_LIST[1:]
+                )
+            ),
+        ]
+
+        for file_stats in self.get_slowest_files(count):
+            line_list.append(
+                '{:.1f}ms {}{}'.format(
+                    file_stats.total_time * 1000,
+                    file_stats.name,
+                    ' (cached)' if file_stats.cached else ''
+                )
+            )
+
+        return '\n'.join(line_list)
+
+    def __str__(self):
+        return self.report()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+import yaml
+import yaml.scanner
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.events import MappingEndEvent, MappingStartEvent, SequenceEndEvent, SequenceStartEvent, StreamEndEvent
+from yaml.parser import Parser
+from yaml.reader import Reader
+from yaml.resolver import Resolver
+from yaml.scanner import Scanner
+from .file_utils import construct_yaml_str, get_file_id, get_yaml_loader
+import logging
+
+
+log = logging.getLogger('configmate.stream')
+
+
+class _PyStreamLoader(Reader, Scanner, Parser, Composer, SafeConstructor, Resolver):
+    """
+    Safe YAML loader that can compose and construct one node at a time from the event stream
+    """
+
+    def __init__(self, stream):
+        Reader.__init__(self, stream)
+        Scanner.__init__(self)
+        Parser.__init__(self)
+        Composer.__init__(self)
+        SafeConstructor.__init__(self)
+        Resolver.__init__(self)
+
+
+STREAM_LOADER_LIST = [_PyStreamLoader]
+
+try:
+    from yaml.cyaml import CParser
+
+    class _CStreamLoader(CParser, Composer, SafeConstructor, Resolver):
+        """
+        As _PyStreamLoader, using the libyaml parser to generate the events
+        """
+
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            Composer.__init__(self)
+            SafeConstructor.__init__(self)
+            Resolver.__init__(self)
+
+    STREAM_LOADER_LIST.insert(0, _CStreamLoader)
+
+except ImportError:
+    # PyYAML built without libyaml
+    CParser = None
+
+for loader_class in STREAM_LOADER_LIST:
+    loader_class.add_constructor(u'tag:yaml.org,2002:str', construct_yaml_str)
+
+
+def _get_stream_loader(yaml_loader = None):
+    """
+    Return the stream loader using the same parser as a YAML loader class
+    """
+
+    if CParser is not None and issubclass(get_yaml_loader(yaml_loader), CParser):
+        return STREAM_LOADER_LIST[0]
+
+    return _PyStreamLoader
+
+
+def _load_node(loader):
+    return loader.construct_document(loader.compose_node(None, None))
+
+
+def _skip_node(loader):
+    depth = 0
+    while True:
+        event = loader.get_event()
+        if isinstance(event, (MappingStartEvent, SequenceStartEvent)):
+            depth += 1
+
+        elif isinstance(event, (MappingEndEvent, SequenceEndEvent)):
+            depth -= 1
+
+        if depth == 0:
+            return
+
+
+def _start_mapping(loader):
+    """
+    Move to the first key of a document containing a mapping
+
+    :return: True if the document is a mapping, otherwise False with the loader at the start of the document value
+    """
+
+    loader.get_event()
+    if loader.check_event(StreamEndEvent):
+        return False
+
+    loader.get_event()
+    if not loader.check_event(MappingStartEvent):
+        return False
+
+    loader.get_event()
+    return True
+
+
+class StreamedList(object):
+    """
+    List value of a top level key in a YAML file, read from the file one item at a time each time it is iterated
+
+    Only the item being read is held in memory. Items can't refer to anchors outside the list.
+    """
+
+    def __init__(self, file_name, key, yaml_loader = None):
+        self._file_name = file_name
+        self._key = key
+        self._yaml_loader = yaml_loader
+        self._file_id = get_file_id(file_name)
+
+    @property
+    def file_name(self):
+        return self._file_name
+
+    @property
+    def key(self):
+        return self._key
+
+    def __iter__(self):
+        with open(self._file_name, 'r') as file_object:
+            loader = _get_stream_loader(self._yaml_loader)(file_object)
+            try:
+                if not _start_mapping(loader):
+                    return
+
+                while not loader.check_event(MappingEndEvent):
+                    key = _load_node(loader)
+                    if key != self._key:
+                        _skip_node(loader)
+                        continue
+
+                    if not loader.check_event(SequenceStartEvent):
+                        return
+
+                    loader.get_event()
+                    while not loader.check_event(SequenceEndEvent):
+                        yield _load_node(loader)
+
+                    return
+
+            finally:
+                loader.dispose()
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, StreamedList):
+            return (self._file_name, self._key, self._file_id) == (other._file_name, other._key, other._file_id)
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash((self._file_name, self._key, self._file_id))
+
+    def __repr__(self):
+        return '{}({!r}, {!r})'.format(self.__class__.__name__, self._file_name, self._key)
+
+
+def read_yaml_file_streamed(file_name, stream_key_set, yaml_loader = None):
+    """
+    Read a file as YAML, with the list values of the given top level keys read as StreamedList objects
+
+    Other values are read as usual. The list values are skipped without being loaded, and read again when iterated.
+
+    :param stream_key_set: set of top level keys to stream
+    :param yaml_loader: optional YAML loader class, the stream uses the same parser
+    :return: parsed YAML data, or None on error
+    """
+
+    try:
+        with open(file_name, 'r') as file_object:
+            loader = _get_stream_loader(yaml_loader)(file_object)
+            try:
+                if not _start_mapping(loader):
+                    # not a mapping, so there is nothing to stream
+                    return None if loader.check_event(StreamEndEvent) else _load_node(loader)
+
+                config_data = {}
+                while not loader.check_event(MappingEndEvent):
+                    key = _load_node(loader)
+                    if key in stream_key_set and loader.check_event(SequenceStartEvent):
+                        _skip_node(loader)
+                        config_data[key] = StreamedList(file_name, key, yaml_loader)
+
+                    else:
+                        config_data[key] = _load_node(loader)
+
+                return config_data
+
+            finally:
+                loader.dispose()
+
+    except yaml.scanner.ScannerError as e:
+        log.error('Invalid YAML data: {}'.format(e))
+
+    return None
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, unicode_literals
+import threading
+import logging
+from .config import ConfigException
+
+
+log = logging.getLogger('configmate.watch')
+
+
+class ConfigWatcher(object):
+    """
+    Reload a config when any of the files it was loaded from change
+
+    Files are polled for changes to their modification time, size or inode. Subscribers are called with the config and
+    the set of changed top level keys after each reload that changes a value.
+
+    Create the config with a FileDataCache, so each reload only parses the files that have changed.
+    """
+
+    def __init__(self, config, interval = 1.0):
+        self._config = config
+        self._interval = interval
+        self._subscriber_list = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def config(self):
+        return self._config
+
+    @property
+    def interval(self):
+        return self._interval
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, callback):
+        self._subscriber_list.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscriber_list.remove(callback)
+
+    def check(self):
+        """
+        Reload the config if any of its files have changed
+
+        Load errors are logged and the current config values are kept, so a partially written file is picked up once
+        it is complete.
+
+        :return: set of changed top level keys
+        """
+
+        changed_file_list = self._config.changed_file_list
+        if not changed_file_list:
+            return set()
+
+        log.info('Config files changed: %s', ', '.join(["'{}'".format(name) for name in changed_file_list]))
+
+        try:
+            changed_key_set = self._config.reload()
+
+        except ConfigException as e:
+            log.error('Unable to reload config: {}'.format(e))
+            return set()
+
+        if changed_key_set:
+            for callback in list(self._subscriber_list):
+                callback(self._config, changed_key_set)
+
+        return changed_key_set
+
+    def start(self):
+        """
+        Start checking for changes on a background thread
+        """
+
+        if self.running:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target = self._run, name = 'configmate.watch')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.check()
+
+            except Exception:
+                log.exception('Config watcher error')
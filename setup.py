@@ -34,5 +34,10 @@ setup(
             'boto3'
         ]
     },
+    entry_points = {
+        'console_scripts': [
+            'configmate-compile = configmate.cli:compile_snapshot',
+        ],
+    },
     zip_safe = False
 )
@@ -6,6 +6,7 @@ import pytest
 from tempfile import mkdtemp
 import os
 from shutil import rmtree
+from configmate.file_utils import get_parser_backend, register_parser_backend, PARSER_BACKEND_YAML
 
 
 LOG_LEVEL = logging.INFO
@@ -50,3 +51,33 @@ def temp_dir(request):
     request.addfinalizer(remove_temp_dir)
 
     return temp_dir_name
+
+
+@pytest.fixture()
+def parse_count(request):
+    """
+    Count the number of times each file is parsed by the YAML parser backend
+
+    :return: dict of parse counts keyed on file name
+    """
+
+    parse_count = {}
+    yaml_backend = get_parser_backend(PARSER_BACKEND_YAML)
+
+    def read_file_counted(file_name, **kwargs):
+        parse_count[file_name] = parse_count.get(file_name, 0) + 1
+        return yaml_backend.read_file(file_name, **kwargs)
+
+    register_parser_backend(
+        PARSER_BACKEND_YAML,
+        read_file_counted,
+        yaml_backend.read_string,
+        yaml_backend.extension_list
+    )
+
+    def restore_backend():
+        register_parser_backend(*yaml_backend)
+
+    request.addfinalizer(restore_backend)
+
+    return parse_count
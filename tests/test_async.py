@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from configmate import Config, ConfigException
+from configmate.config import ConfigFileLoader, ConfigStringLoader
+from test_from_file import write_file, YAML_LOOKUP_FILE_DATA, YAML_LOOKUP_FILE_NAME
+
+try:
+    import asyncio
+    from concurrent import futures
+
+except ImportError:
+    asyncio = futures = None
+
+
+requires_asyncio = pytest.mark.skipif(asyncio is None, reason = 'asyncio is not available')
+
+
+class StubLoop(object):
+    """
+    Event loop that runs functions as soon as they are passed to run_in_executor, recording the executors used
+    """
+
+    def __init__(self):
+        self.executor_list = []
+
+    def run_in_executor(self, executor, function):
+        self.executor_list.append(executor)
+        return function()
+
+
+@pytest.fixture()
+def event_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def write_include_files(temp_dir):
+    write_file(YAML_LOOKUP_FILE_DATA, file_name = YAML_LOOKUP_FILE_NAME, root_dir = temp_dir, dump_yaml = True)
+    return write_file('include:\n- {}\nghi: 456\n'.format(YAML_LOOKUP_FILE_NAME), root_dir = temp_dir)
+
+
+def test_aload_stub_loop(temp_dir):
+    file_name = write_include_files(temp_dir)
+    loop = StubLoop()
+    executor = object()
+
+    config = Config.aload(from_file = file_name, loop = loop, executor = executor, max_workers = 2)
+    assert config == Config(from_file = file_name)
+    assert loop.executor_list == [executor]
+
+
+def test_loader_aget_data_stub_loop(temp_dir):
+    file_name = write_file(YAML_LOOKUP_FILE_DATA, root_dir = temp_dir, dump_yaml = True)
+    loop = StubLoop()
+
+    for config_loader in (ConfigFileLoader(file_name), ConfigStringLoader('abc: easy as\ndef: 123\n')):
+        assert config_loader.aget_data(loop = loop) == [YAML_LOOKUP_FILE_DATA]
+
+    assert loop.executor_list == [None, None]
+
+
+@pytest.mark.skipif(asyncio is not None, reason = 'asyncio is available')
+def test_error_without_asyncio():
+    with pytest.raises(ConfigException):
+        Config.aload(from_string = 'abc: 123\n')
+
+
+@requires_asyncio
+def test_aload(temp_dir, event_loop):
+    file_name = write_include_files(temp_dir)
+
+    with futures.ThreadPoolExecutor(max_workers = 1) as executor:
+        config = event_loop.run_until_complete(
+            Config.aload(from_file = file_name, loop = event_loop, executor = executor, max_workers = 2)
+        )
+
+    assert config == Config(from_file = file_name)
+    assert config.sources == "'{}'".format(file_name)
+
+
+@requires_asyncio
+def test_loader_aget_data(temp_dir, event_loop):
+    file_name = write_file(YAML_LOOKUP_FILE_DATA, root_dir = temp_dir, dump_yaml = True)
+
+    for config_loader in (ConfigFileLoader(file_name), ConfigStringLoader('abc: easy as\ndef: 123\n')):
+        config_data_list = event_loop.run_until_complete(config_loader.aget_data(loop = event_loop))
+        assert config_data_list == [YAML_LOOKUP_FILE_DATA]
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import pytest
+from configmate import Config, ConfigException, FrozenConfig
+
+
+DEFAULTS = {'a': 1, 'b': 9, 'pair': '${a}:${b}', 'server': {'host': 'localhost', 'ports': [80, 443]}}
+
+
+def test_snapshot():
+    config = Config(defaults = DEFAULTS)
+    snapshot = config.snapshot
+    assert isinstance(snapshot, FrozenConfig)
+    assert snapshot['pair'] == '1:9'
+    assert config.snapshot is snapshot
+
+    config['a'] = 2
+    assert snapshot['pair'] == '1:9'
+    assert config.snapshot['a'] == 2
+    assert config.snapshot['pair'] == '2:9'
+    # values that didn't change are shared with the previous snapshot
+    assert config.snapshot['server'] is snapshot['server']
+
+    del config['server']
+    assert 'server' not in config.snapshot
+
+
+def test_set_before_snapshot():
+    config = Config(defaults = DEFAULTS)
+    config['a'] = 3
+    del config['server']
+    with pytest.raises(KeyError):
+        del config['server']
+
+    assert config.snapshot == {'a': 3, 'b': 9, 'pair': '3:9'}
+
+
+@pytest.mark.parametrize('layered', [False, True])
+def test_update_batch(layered):
+    config = Config(defaults = DEFAULTS, layered = layered)
+    snapshot = config.snapshot
+    with config.update_batch():
+        config['a'] = 5
+        config['b'] = 5
+        with config.update_batch():
+            config['c'] = 'new'
+
+        assert config.snapshot is snapshot
+
+    assert config.snapshot['pair'] == '5:5'
+    assert config.snapshot['c'] == 'new'
+    assert config['c'] == 'new'
+
+
+@pytest.mark.parametrize('layered', [False, True])
+def test_update_batch_roll_back(layered):
+    config = Config(defaults = DEFAULTS, layered = layered)
+    snapshot = config.snapshot
+    with pytest.raises(KeyError):
+        with config.update_batch():
+            config['a'] = 5
+            config['c'] = 'new'
+            del config['missing']
+
+    assert config.snapshot is snapshot
+    assert config['a'] == 1
+    assert config['pair'] == '1:9'
+    assert 'c' not in config
+    if layered:
+        assert config.get_key_sources('a') == ['<defaults>']
+
+
+def test_update_batch_roll_back_runtime_value():
+    config = Config(defaults = DEFAULTS, layered = True)
+    config['a'] = 2
+    with pytest.raises(KeyError):
+        with config.update_batch():
+            config['a'] = 3
+            del config['missing']
+
+    assert config['a'] == 2
+    assert config.get_key_sources('a') == ['<runtime>']
+
+
+@pytest.mark.parametrize('read_snapshot', [False, True])
+def test_update_batch_invalid_expression(read_snapshot):
+    config = Config(defaults = DEFAULTS)
+    if read_snapshot:
+        config.snapshot
+
+    # setting values doesn't expand them, even if the snapshot is in use
+    config['x'] = '${y}'
+    config['a'] = '${pair}'
+    with pytest.raises(ConfigException):
+        config['pair']
+
+    with pytest.raises(ConfigException):
+        config.snapshot
+
+    config['a'] = 3
+    config['y'] = 'z'
+    assert config.snapshot['pair'] == '3:9'
+    assert config.snapshot['x'] == 'z'
+
+
+def test_update_batch_threads():
+    config = Config(defaults = DEFAULTS)
+    config.snapshot
+    stop_event = threading.Event()
+    error_list = []
+
+    def read():
+        while not stop_event.is_set():
+            snapshot = config.snapshot
+            if snapshot['a'] + snapshot['b'] != 10 or snapshot['pair'] != '{a}:{b}'.format(**snapshot):
+                error_list.append(dict(snapshot))
+
+    thread_list = [threading.Thread(target = read) for _ in range(4)]
+    for thread in thread_list:
+        thread.start()
+
+    try:
+        for value in range(1000):
+            with config.update_batch():
+                config['a'] = value % 10
+                config['b'] = 10 - value % 10
+
+    finally:
+        stop_event.set()
+        for thread in thread_list:
+            thread.join()
+
+    assert not error_list
+
+
+def test_set_during_expansion():
+    config = Config(defaults = {'a': 'old', 'b': '${a}'})
+    expanding = threading.Event()
+    updated = threading.Event()
+    expand_parameter = config.expand_parameter
+
+    def expand_parameter_slow(value):
+        expanded_value = expand_parameter(value)
+        if threading.current_thread() is reader:
+            expanding.set()
+            updated.wait(5)
+
+        return expanded_value
+
+    config.expand_parameter = expand_parameter_slow
+    reader = threading.Thread(target = lambda: config['b'])
+    reader.start()
+    try:
+        assert expanding.wait(5)
+        config['a'] = 'new'
+
+    finally:
+        updated.set()
+        reader.join()
+
+    # the values expanded from the previous value are not cached
+    assert config['a'] == 'new'
+    assert config['b'] == 'new'
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from configmate import Config, ConfigException
+from configmate.expression import compile_expression
+
+
+EXPRESSION_CONFIG = '''
+name: world
+count: 3
+greeting: hello ${name}
+count_copy: ${count}
+count_text: ${count} times
+price: $$5 or $${name}
+nested:
+  items:
+  - first
+  - ${greeting}
+list_item: ${nested.items.1}!
+plain:
+  abc: easy as
+'''
+
+
+@pytest.mark.parametrize(
+    'key, expected_value',
+    (
+        ('greeting', 'hello world'),
+        ('count_copy', 3),
+        ('count_text', '3 times'),
+        ('price', '$5 or ${name}'),
+        ('nested', {'items': ['first', 'hello world']}),
+        ('list_item', 'hello world!'),
+    )
+)
+def test_expression(key, expected_value):
+    config = Config(from_string = EXPRESSION_CONFIG)
+    assert config[key] == expected_value
+
+
+def test_expression_not_copied():
+    config = Config(from_string = EXPRESSION_CONFIG)
+    assert config['plain'] is config['plain']
+    assert config['nested'] is config['nested']
+
+    config['plain']['abc'] = 'changed'
+    assert config['plain'] == {'abc': 'changed'}
+
+
+def test_expression_invalidation():
+    config = Config(from_string = EXPRESSION_CONFIG)
+    assert config['list_item'] == 'hello world!'
+
+    config['name'] = 'there'
+    assert config['list_item'] == 'hello there!'
+
+    del config['name']
+    with pytest.raises(ConfigException):
+        config['greeting']
+
+
+def test_expression_compiled_once():
+    assert compile_expression('hello ${name}') is compile_expression('hello ${name}')
+
+
+def test_expression_in_include(temp_dir):
+    with open('lookup.yml', 'w') as file_object:
+        file_object.write('abc: easy as\n')
+
+    config = Config(from_string = 'name: lookup\ninclude:\n- ${name}.yml\n')
+    assert config == {'name': 'lookup', 'abc': 'easy as'}
+
+
+def test_expression_in_include_changed(temp_dir):
+    for file_name, file_data in (
+            ('dev-1.yml', 'abc: dev\n'),
+            ('env.yml', 'env: prod\nenv_ref: ${env}\n'),
+            ('prod-2.yml', 'def: prod\n'),
+    ):
+        with open(file_name, 'w') as file_object:
+            file_object.write(file_data)
+
+    # the include names are expanded with the values merged so far
+    config = Config(from_string = 'env: dev\ninclude:\n- ${env}-1.yml\n- env.yml\n- ${env}-2.yml\n')
+    assert config == {'env': 'prod', 'env_ref': 'prod', 'abc': 'dev', 'def': 'prod'}
+    config['env'] = 'test'
+    assert config['env_ref'] == 'test'
+
+
+@pytest.mark.parametrize(
+    'value',
+    (
+        '${missing}',
+        '${name.missing}',
+        '${count.0}',
+        '${nested.items.5}',
+        '${nested.items.first}',
+        '${}',
+        '${name',
+        '${name.}',
+        '${name value}',
+    )
+)
+def test_error_on_invalid_expression(value):
+    config = Config(from_string = EXPRESSION_CONFIG)
+    config['invalid'] = value
+
+    with pytest.raises(ConfigException):
+        config['invalid']
+
+
+CIRCULAR_CONFIG = '''
+abc: ${def}
+def: ${ghi.value}
+ghi:
+  value: ${abc}
+self: ${self}
+other: easy as
+'''
+
+
+@pytest.mark.parametrize(
+    'key, expected_message',
+    (
+        ('abc', "'abc' -> 'def' -> 'ghi' -> 'abc'"),
+        ('ghi', "'ghi' -> 'abc' -> 'def' -> 'ghi'"),
+        ('self', "'self' -> 'self'"),
+    )
+)
+def test_error_on_circular_reference(key, expected_message):
+    config = Config(from_string = CIRCULAR_CONFIG)
+    assert config['other'] == 'easy as'
+
+    with pytest.raises(ConfigException) as exc_info:
+        config[key]
+
+    assert expected_message in str(exc_info.value)
+
+
+def test_error_on_circular_reference_when_resolved():
+    with pytest.raises(ConfigException) as exc_info:
+        Config(from_string = CIRCULAR_CONFIG, resolve = True)
+
+    assert 'Circular reference' in str(exc_info.value)
+
+
+def test_resolve():
+    config = Config(from_string = EXPRESSION_CONFIG, resolve = True)
+    assert config._state.value_cache == dict(config)
+
+
+def test_expression_dependent_invalidation():
+    config = Config(from_string = EXPRESSION_CONFIG, resolve = True)
+    count_text = config['count_text']
+
+    config['name'] = 'there'
+    assert set(config._state.value_cache) == set(config) - {'name', 'greeting', 'nested', 'list_item'}
+    assert config['count_text'] is count_text
+    assert config['list_item'] == 'hello there!'
+
+    config['greeting'] = 'hi'
+    assert config['list_item'] == 'hi!'
+    config['name'] = 'again'
+    assert config['list_item'] == 'hi!'
@@ -6,8 +6,11 @@ from configmate import (
     ConfigException,
     ConfigLoadException,
     ConfigLoadFormatException,
+    FileDataCache,
 )
 from configmate.config import ConfigStringLoader
+from configmate.file_utils import construct_yaml_str, get_yaml_loader_list, PathIndex, PARSER_BACKEND_JSON
+import json
 import os
 import yaml
 import uuid
@@ -155,4 +158,227 @@ def test_error_on_invalid_include(temp_dir, test_data):
         Config(from_file = file_name)
 
 
+def test_nested_includes_parsed_once(temp_dir, parse_count):
+    include_depth = 5
+    for index in range(include_depth):
+        file_data = 'level{}: {}\n'.format(index, index)
+        if index + 1 < include_depth:
+            file_data += 'include:\n- level{}.yml\n'.format(index + 1)
+
+        write_file(file_data, file_name = 'level{}.yml'.format(index), root_dir = temp_dir)
+
+    config = Config(from_file = 'level0.yml')
+    assert config == {'level{}'.format(index): index for index in range(include_depth)}
+    assert config.sources == "'level0.yml'"
+    assert len(parse_count) == include_depth
+    assert all(count == 1 for count in parse_count.values())
+
+
+def test_file_cache(temp_dir, parse_count):
+    write_file({'base': {'abc': 1}}, file_name = 'base.yml', root_dir = temp_dir, dump_yaml = True)
+    write_file('include:\n- base.yml\n', file_name = 'main.yml', root_dir = temp_dir)
+
+    cache = FileDataCache()
+    for _ in range(3):
+        config = Config(from_file = 'main.yml', cache = cache)
+        assert config == {'base': {'abc': 1}}
+
+        # modifying the config must not modify the cached data
+        config['base']['abc'] = 2
+
+    assert all(count == 1 for count in parse_count.values())
+    assert cache.misses == 2
+    assert cache.hits == 4
+
+    write_file({'base': {'abc': 123}}, file_name = 'base.yml', root_dir = temp_dir, dump_yaml = True)
+
+    config = Config(from_file = 'main.yml', cache = cache)
+    assert config == {'base': {'abc': 123}}
+    assert parse_count[os.path.join('', 'base.yml')] == 2
+
+
+def test_file_cache_eviction(temp_dir):
+    cache = FileDataCache(max_size = 2)
+    file_name_list = [write_file('abc: {}\n'.format(index), root_dir = temp_dir) for index in range(3)]
+
+    for file_name in file_name_list:
+        Config(from_file = file_name, cache = cache)
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+
+    Config(from_file = file_name_list[0], cache = cache)
+    assert cache.hits == 0
+    assert cache.misses == 4
+
+    Config(from_file = file_name_list[2], cache = cache)
+    assert cache.hits == 1
+
+    with pytest.raises(ValueError):
+        FileDataCache(max_size = 0)
+
+
+@pytest.mark.parametrize(
+    'yaml_loader',
+    get_yaml_loader_list()
+)
+def test_yaml_loader(temp_dir, yaml_loader):
+    config_string = u'abc: easy as\ndef: 123\nghi: \u00e9asy as\n'
+    file_name = write_file(config_string.encode('utf-8'), root_dir = temp_dir)
+
+    for config in (
+        Config(from_string = config_string, yaml_loader = yaml_loader),
+        Config(from_file = file_name, yaml_loader = yaml_loader),
+    ):
+        assert config == dict(YAML_LOOKUP_FILE_DATA, ghi = u'\u00e9asy as')
+        assert isinstance(config['abc'], type(u''))
+
+    with pytest.raises(ConfigLoadException):
+        Config(from_string = YAML_INVALID_DATA_LIST[-1], yaml_loader = yaml_loader)
+
+    # the yaml loader classes are not modified
+    assert yaml_loader.yaml_constructors[u'tag:yaml.org,2002:str'] is not construct_yaml_str
+
+
+def test_json_backend(temp_dir, parse_count):
+    json_data = json.dumps(YAML_LOOKUP_FILE_DATA)
+    write_file(json_data, file_name = 'lookup.json', root_dir = temp_dir)
+    file_name = write_file('include:\n- lookup.json\n', root_dir = temp_dir)
+
+    config = Config(from_file = file_name)
+    assert config == YAML_LOOKUP_FILE_DATA
+    assert list(parse_count.keys()) == [file_name]
+
+    config = Config(from_string = json_data, backend = PARSER_BACKEND_JSON)
+    assert config == YAML_LOOKUP_FILE_DATA
+
+    json_file_name = write_file(json_data, root_dir = temp_dir)
+    config = Config(from_file = json_file_name, backend = PARSER_BACKEND_JSON)
+    assert config == YAML_LOOKUP_FILE_DATA
+    assert json_file_name not in parse_count
+
+
+@pytest.mark.parametrize(
+    'invalid_data',
+    ('', '"str"', '123', 'true', '[1, 2]', '{"abc": ')
+)
+def test_json_backend_error_on_invalid_data(temp_dir, invalid_data):
+    with pytest.raises(ConfigLoadException):
+        Config(from_string = invalid_data, backend = PARSER_BACKEND_JSON)
+
+    write_file(invalid_data, file_name = 'invalid.json', root_dir = temp_dir)
+
+    with pytest.raises(ConfigLoadFormatException):
+        Config(from_file = 'invalid.json')
+
+    with pytest.raises(ConfigLoadFormatException):
+        Config(from_string = 'include_optional:\n- invalid.json')
+
+
+def test_error_on_unknown_backend():
+    with pytest.raises(ConfigException):
+        Config(from_string = '{}', backend = 'unknown')
+
+
+def test_diamond_includes(temp_dir, parse_count):
+    write_file('include:\n- b.yml\n- c.yml\nabc: a\n', file_name = 'a.yml', root_dir = temp_dir)
+    write_file('include:\n- common.yml\nabc: b\ndef: b\n', file_name = 'b.yml', root_dir = temp_dir)
+    write_file('include_optional:\n- common.yml\ndef: c\nghi: c\n', file_name = 'c.yml', root_dir = temp_dir)
+    write_file('include:\n- leaf.yml\nghi: common\n', file_name = 'common.yml', root_dir = temp_dir)
+    write_file('def: leaf\n', file_name = 'leaf.yml', root_dir = temp_dir)
+
+    # merged in the order a, b, c, common, leaf
+    config = Config(from_file = 'a.yml', defaults = {'abc': 'default', 'jkl': 'default'})
+    assert config == {'abc': 'b', 'def': 'leaf', 'ghi': 'common', 'jkl': 'default'}
+    assert sorted(parse_count.values()) == [1] * 5
+
+
+@pytest.mark.parametrize(
+    'file_data_map, expected_message',
+    (
+        (
+            {'a.yml': 'include:\n- a.yml\n'},
+            "'a.yml' -> 'a.yml'",
+        ),
+        (
+            {'a.yml': 'include:\n- b.yml\n', 'b.yml': 'include_optional:\n- c.yml\n', 'c.yml': 'include:\n- b.yml\n'},
+            "'b.yml' -> 'c.yml' -> 'b.yml'",
+        ),
+    )
+)
+def test_error_on_circular_include(temp_dir, file_data_map, expected_message):
+    for file_name, file_data in file_data_map.items():
+        write_file(file_data, file_name = file_name, root_dir = temp_dir)
+
+    with pytest.raises(ConfigLoadFormatException) as exc_info:
+        Config(from_file = 'a.yml')
+
+    assert expected_message in str(exc_info.value)
+
+
+def test_parallel_includes(temp_dir, parse_count):
+    os.mkdir('first')
+    os.mkdir('second')
+    for index in range(10):
+        write_file(
+            'value{}: {}\nshared: {}\ninclude:\n- common.yml\n'.format(index, index, index),
+            file_name = 'include{}.yml'.format(index),
+            root_dir = 'second'
+        )
+
+    write_file('value0: first\n', file_name = 'include0.yml', root_dir = 'first')
+    write_file('common: common\nname: include9\n', file_name = 'common.yml', root_dir = 'first')
+    write_file(
+        'include:\n{}\n- ${{name}}.yml\ninclude_optional:\n- missing.yml\n- include1.yml\n'.format(
+            '\n'.join(['- include{}.yml'.format(index) for index in range(9)])
+        ),
+        file_name = 'main.yml',
+        root_dir = 'first'
+    )
+
+    config_list = [
+        Config(from_file = 'main.yml', path_list = ['first', 'second'], max_workers = max_workers)
+        for max_workers in (None, 4)
+    ]
+    assert config_list[0] == config_list[1]
+    assert config_list[0]['value0'] == 'first'
+    assert config_list[0]['shared'] == 1
+    assert set(parse_count.values()) == {2}
+
+    with pytest.raises(ConfigLoadException):
+        Config(from_string = 'include:\n- first/main.yml\n- missing.yml\n', max_workers = 4)
+
+
+def test_path_index(temp_dir, parse_count):
+    for dir_name in ('first', 'second', 'third'):
+        os.mkdir(dir_name)
+
+    write_file('abc: first\n', file_name = 'lookup.yml', root_dir = 'first')
+    write_file('abc: third\ndef: third\n', file_name = 'lookup.yml', root_dir = 'third')
+    absolute_file_name = write_file('ghi: absolute\n', root_dir = temp_dir)
+
+    config_string = 'include:\n- lookup.yml\n- {}\ninclude_optional:\n- missing.yml\n'.format(absolute_file_name)
+    path_list = ['first', 'second', 'third']
+
+    config = Config(from_string = config_string, path_list = path_list)
+    assert config == {'abc': 'first', 'def': 'third', 'ghi': 'absolute'}
+    assert sorted(parse_count) == sorted([absolute_file_name, 'first/lookup.yml', 'third/lookup.yml'])
+    assert set(parse_count.values()) == {1}
+
+    path_index = PathIndex(validate = True)
+    config = Config(from_string = config_string, path_list = path_list, path_index = path_index)
+    assert config['abc'] == 'first'
+
+    write_file('abc: second\n', file_name = 'lookup.yml', root_dir = 'second')
+    write_file('jkl: missing\n', file_name = 'missing.yml', root_dir = 'third')
+
+    config = Config(from_string = config_string, path_list = path_list, path_index = path_index)
+    assert config == {'abc': 'first', 'def': 'third', 'ghi': 'absolute', 'jkl': 'missing'}
+    assert parse_count['second/lookup.yml'] == 1
+
+    assert path_index.exists('second/lookup.yml') is True
+    assert path_index.exists('second/missing.yml') is False
+    assert path_index.exists('missing/lookup.yml') is None
+
+
 # TODO test path list
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import pickle
+import pytest
+from configmate import Config, FrozenConfig, FrozenDict, FrozenList, freeze
+from configmate.merge import MERGE_LIST_APPEND
+
+
+DEFAULTS = {'server': {'host': 'localhost', 'options': {'debug': False}}, 'hosts': ['a'], 'name': 'app'}
+
+
+def test_freeze():
+    frozen_data = freeze(DEFAULTS)
+    assert frozen_data == DEFAULTS
+    assert isinstance(frozen_data, FrozenDict)
+    assert isinstance(frozen_data['server']['options'], FrozenDict)
+    assert isinstance(frozen_data['hosts'], FrozenList)
+    assert freeze(frozen_data) is frozen_data
+
+    with pytest.raises(TypeError):
+        frozen_data['name'] = 'other'
+
+    with pytest.raises(TypeError):
+        frozen_data['server'].update({'port': 8080})
+
+    with pytest.raises(TypeError):
+        frozen_data['hosts'].append('b')
+
+    with pytest.raises(TypeError):
+        frozen_data['hosts'] += ['b']
+
+    assert frozen_data == DEFAULTS
+
+
+def test_freeze_pickle():
+    frozen_data = freeze(DEFAULTS)
+    loaded_data = pickle.loads(pickle.dumps(frozen_data, pickle.HIGHEST_PROTOCOL))
+    assert loaded_data == frozen_data
+    assert isinstance(loaded_data['hosts'], FrozenList)
+
+
+def test_frozen_defaults_shared():
+    frozen_defaults = freeze(DEFAULTS)
+
+    config = Config(from_string = 'name: one\n', defaults = frozen_defaults)
+    other_config = Config(from_string = 'name: two\n', defaults = frozen_defaults)
+    assert config['server'] is frozen_defaults['server']
+    assert other_config['server'] is frozen_defaults['server']
+    assert config['name'] == 'one'
+    assert other_config['name'] == 'two'
+
+    config['server'] = {'host': 'example.com'}
+    assert config['server'] == {'host': 'example.com'}
+    assert other_config['server'] is frozen_defaults['server']
+    assert frozen_defaults == DEFAULTS
+
+
+@pytest.mark.parametrize('layered', (False, True))
+def test_frozen_defaults_merged(layered):
+    frozen_defaults = freeze(DEFAULTS)
+
+    config = Config(
+        from_string = 'server:\n  options:\n    timeout: 30\nhosts:\n- b\n',
+        defaults = frozen_defaults,
+        merge_strategy = MERGE_LIST_APPEND,
+        layered = layered
+    )
+    assert config['server'] == {'host': 'localhost', 'options': {'debug': False, 'timeout': 30}}
+    assert config['hosts'] == ['a', 'b']
+    assert frozen_defaults == DEFAULTS
+
+
+def test_config_freeze():
+    config = Config(
+        from_string = 'name: world\ngreeting: hello ${name}\nserver:\n  title: ${name} server\n  hosts:\n  - a\n'
+    )
+    frozen_config = config.freeze()
+    assert isinstance(frozen_config, FrozenConfig)
+    assert frozen_config == {
+        'name': 'world',
+        'greeting': 'hello world',
+        'server': {'title': 'world server', 'hosts': ['a']},
+    }
+    assert frozen_config.sources == config.sources
+    assert hash(frozen_config) == hash(config.freeze())
+
+    with pytest.raises(TypeError):
+        frozen_config['name'] = 'other'
+
+    with pytest.raises(TypeError):
+        frozen_config['server']['hosts'].append('b')
+
+    config['name'] = 'other'
+    assert frozen_config['greeting'] == 'hello world'
+    assert config.freeze()['greeting'] == 'hello other'
+
+    loaded_config = pickle.loads(pickle.dumps(frozen_config, pickle.HIGHEST_PROTOCOL))
+    assert loaded_config == frozen_config
+    assert loaded_config.sources == frozen_config.sources
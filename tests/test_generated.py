@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from configmate import Config, ConfigException
+from configmate import generated
+from configmate.generated import register_generator
+import json
+import re
+import uuid
+
+
+GENERATED_CONFIG = '''
+name: world
+session: ${uuid()}
+other_session: ${uuid()}
+shared: ${uuid(shared)}
+also_shared: ${uuid(shared)}
+token: token-${token()}
+greeting: hello ${name} at ${timestamp()}
+'''
+
+
+def test_generated_values():
+    config = Config(from_string = GENERATED_CONFIG)
+
+    session = config['session']
+    assert uuid.UUID(session)
+    assert config['other_session'] != session
+    assert config['shared'] == config['also_shared']
+    assert re.match(r'^token-[0-9a-f]{32}$', config['token'])
+    assert re.match(r'^hello world at \d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ$', config['greeting'])
+
+    # values are not generated again when the cached values are cleared
+    greeting = config['greeting']
+    config['name'] = 'world'
+    config['session'] = '${uuid()}'
+    assert config['session'] == session
+    assert config['greeting'] == greeting
+
+    assert Config(from_string = GENERATED_CONFIG)['session'] != session
+
+
+def test_generated_values_file(temp_dir):
+    config = Config(from_string = GENERATED_CONFIG, generated_file = 'generated.json')
+    value_map = {key: config[key] for key in ('session', 'shared', 'token')}
+
+    with open('generated.json') as file_object:
+        assert set(json.load(file_object)) == {'uuid:session', 'uuid:shared', 'token:token'}
+
+    config = Config(from_string = GENERATED_CONFIG, generated_file = 'generated.json')
+    assert {key: config[key] for key in value_map} == value_map
+
+
+def test_register_generator(monkeypatch):
+    # register the generator in a copy of the registry, so it isn't used by other tests
+    monkeypatch.setattr(generated, '_generator_map', dict(generated._generator_map))
+    value_list = []
+
+    def generate_counter():
+        value_list.append(len(value_list))
+        return value_list[-1]
+
+    register_generator('counter', generate_counter)
+
+    config = Config(from_string = 'abc: ${counter()}\ndef: ${counter()}\nghi: ${counter(abc)}\n')
+    assert [config[key] for key in ('abc', 'def', 'ghi')] == [0, 1, 0]
+    assert value_list == [0, 1]
+
+
+def test_register_generator_removed():
+    with pytest.raises(ValueError):
+        generated.get_generator('counter')
+
+
+def test_error_on_unknown_generator():
+    config = Config(from_string = 'abc: ${unknown()}\n')
+
+    with pytest.raises(ConfigException):
+        config['abc']
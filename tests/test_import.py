@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+
+
+DEFERRED_MODULE_LIST = ['yaml', 'json', 'multiprocessing', 'uuid', 'tempfile', 'pickle', 'cPickle', 'datetime']
+
+IMPORT_SCRIPT = '''
+import sys
+
+module_set = set(sys.modules)
+import configmate
+for name in sorted(set(sys.modules) - module_set):
+    if sys.modules[name] is not None:
+        print(name)
+'''
+
+
+def run_import_script():
+    """
+    Import configmate in a new interpreter
+
+    :return: list of the modules imported
+    """
+
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output([sys.executable, '-c', IMPORT_SCRIPT], cwd = package_dir)
+    return output.decode('utf-8').split()
+
+
+def test_import_defers_dependencies():
+    module_list = run_import_script()
+    assert 'configmate.config' in module_list
+    for module_name in DEFERRED_MODULE_LIST:
+        assert module_name not in module_list
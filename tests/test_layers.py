@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from configmate import Config, ConfigException
+from configmate.layers import LayeredConfig, LAYER_DEFAULTS_NAME, LAYER_OVERRIDE_NAME
+from configmate.merge import MERGE_DEEP, MERGE_LIST_APPEND, MERGE_LIST_UNIQUE, MERGE_REPLACE
+from test_from_file import write_file
+from test_merge import BASE_DATA, OVERRIDE_DATA
+
+
+@pytest.mark.parametrize(
+    'merge_strategy, merge_strategy_map',
+    (
+        (MERGE_REPLACE, None),
+        (MERGE_DEEP, None),
+        (MERGE_LIST_APPEND, {'server.options': MERGE_REPLACE}),
+        (MERGE_DEEP, {'server.hosts': MERGE_LIST_UNIQUE}),
+        (MERGE_REPLACE, {'server': MERGE_DEEP}),
+    )
+)
+def test_layered_matches_merged(temp_dir, merge_strategy, merge_strategy_map):
+    write_file(OVERRIDE_DATA, file_name = 'override.yml', root_dir = temp_dir)
+
+    options = dict(
+        from_string = BASE_DATA,
+        defaults = {'server': {'user': 'admin'}, 'version': 1},
+        merge_strategy = merge_strategy,
+        merge_strategy_map = merge_strategy_map
+    )
+    config = Config(**options)
+    layered_config = Config(layered = True, **options)
+
+    assert dict(layered_config) == dict(config)
+
+
+def test_layered_sources(temp_dir):
+    write_file(OVERRIDE_DATA, file_name = 'override.yml', root_dir = temp_dir)
+
+    config = Config(from_string = BASE_DATA, defaults = {'version': 1}, merge_strategy = MERGE_DEEP, layered = True)
+    assert config.get_key_sources('server') == ['override.yml', '<string>']
+    assert config.get_key_sources('logging') == ['<string>']
+    assert config.get_key_sources('version') == [LAYER_DEFAULTS_NAME]
+    assert config.get_key_sources('missing') == []
+
+    config['logging'] = {'level': 'debug'}
+    assert config['logging'] == {'level': 'debug'}
+    assert config.get_key_sources('logging') == [LAYER_OVERRIDE_NAME]
+
+    del config['version']
+    assert 'version' not in config
+    assert config.get_key_sources('version') == []
+
+
+def test_key_sources_not_layered():
+    config = Config(from_string = 'abc: 123\n')
+    with pytest.raises(ConfigException):
+        config.get_key_sources('abc')
+
+
+def test_layered_merge_on_read():
+    base_data = {'server': {'port': 8080, 'hosts': ['a']}, 'name': 'base'}
+    override_data = {'server': {'hosts': ['b']}, 'name': 'override'}
+
+    layered_config = LayeredConfig(MERGE_LIST_APPEND)
+    layered_config.add_layer(base_data, 'base')
+    layered_config.add_layer(override_data, 'override')
+
+    # values from a single layer are not copied
+    assert layered_config['name'] is override_data['name']
+    assert layered_config.get_value_list('server') == [override_data['server'], base_data['server']]
+
+    server = layered_config['server']
+    assert server == {'port': 8080, 'hosts': ['a', 'b']}
+    assert layered_config['server'] is server
+    assert base_data == {'server': {'port': 8080, 'hosts': ['a']}, 'name': 'base'}
+    assert override_data == {'server': {'hosts': ['b']}, 'name': 'override'}
+
+    layered_config.add_layer({'server': {'port': 9090}}, 'local')
+    assert layered_config['server'] == {'port': 9090, 'hosts': ['a', 'b']}
+
+
+def test_layered_type_change():
+    layered_config = LayeredConfig(MERGE_DEEP)
+    layered_config.add_layer({'server': {'port': 8080}}, 'base')
+    layered_config.add_layer({'server': 'localhost:8080'}, 'middle')
+    layered_config.add_layer({'server': {'host': 'localhost'}}, 'top')
+
+    assert layered_config['server'] == {'host': 'localhost'}
+    assert layered_config.get_sources('server') == ['top']
+
+
+def test_layered_expression():
+    config = Config(
+        from_string = 'name: app\nserver:\n  title: ${name} server\n',
+        defaults = {'server': {'port': 8080}},
+        merge_strategy = MERGE_DEEP,
+        layered = True
+    )
+    assert config['server'] == {'port': 8080, 'title': 'app server'}
+
+    config['name'] = 'other'
+    assert config['server']['title'] == 'other server'
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from configmate import Config, ConfigException
+from configmate.merge import ConfigMerger, MERGE_DEEP, MERGE_LIST_APPEND, MERGE_LIST_UNIQUE, MERGE_REPLACE
+from test_from_file import write_file
+
+
+BASE_DATA = '''
+include:
+- override.yml
+server:
+  host: localhost
+  port: 8080
+  options:
+    debug: false
+  hosts:
+  - a
+  - b
+  tags:
+  - x
+logging:
+  level: info
+'''
+
+OVERRIDE_DATA = '''
+server:
+  port: 9090
+  options:
+    timeout: 30
+  hosts:
+  - b
+  - c
+  - c
+  tags:
+  - y
+'''
+
+
+@pytest.mark.parametrize(
+    'merge_strategy, merge_strategy_map, expected_server',
+    (
+        (
+            MERGE_REPLACE,
+            None,
+            {'port': 9090, 'options': {'timeout': 30}, 'hosts': ['b', 'c', 'c'], 'tags': ['y']},
+        ),
+        (
+            MERGE_DEEP,
+            None,
+            {
+                'host': 'localhost',
+                'port': 9090,
+                'options': {'debug': False, 'timeout': 30},
+                'hosts': ['b', 'c', 'c'],
+                'tags': ['y'],
+            },
+        ),
+        (
+            MERGE_LIST_APPEND,
+            {'server.options': MERGE_REPLACE},
+            {
+                'host': 'localhost',
+                'port': 9090,
+                'options': {'timeout': 30},
+                'hosts': ['a', 'b', 'b', 'c', 'c'],
+                'tags': ['x', 'y'],
+            },
+        ),
+        (
+            MERGE_DEEP,
+            {'server.hosts': MERGE_LIST_UNIQUE},
+            {
+                'host': 'localhost',
+                'port': 9090,
+                'options': {'debug': False, 'timeout': 30},
+                'hosts': ['a', 'b', 'c'],
+                'tags': ['y'],
+            },
+        ),
+    )
+)
+def test_merge_strategy(temp_dir, merge_strategy, merge_strategy_map, expected_server):
+    write_file(OVERRIDE_DATA, file_name = 'override.yml', root_dir = temp_dir)
+
+    config = Config(
+        from_string = BASE_DATA,
+        merge_strategy = merge_strategy,
+        merge_strategy_map = merge_strategy_map
+    )
+    assert config['server'] == expected_server
+    assert config['logging'] == {'level': 'info'}
+
+
+@pytest.mark.parametrize('layered', [False, True])
+def test_merge_strategy_nested(temp_dir, layered):
+    write_file('db:\n  pool:\n    size: 10\n  hosts:\n  - b\n', file_name = 'override.yml', root_dir = temp_dir)
+
+    config = Config(
+        from_string = 'include:\n- override.yml\ndb:\n  pool:\n    size: 5\n    timeout: 30\n  hosts:\n  - a\n',
+        merge_strategy_map = {'db': MERGE_DEEP, 'db.hosts': MERGE_LIST_APPEND},
+        layered = layered
+    )
+
+    # the strategy for a key applies to the values nested below it
+    assert config['db'] == {'pool': {'size': 10, 'timeout': 30}, 'hosts': ['a', 'b']}
+
+
+def test_merge_does_not_modify_sources():
+    defaults = {'server': {'options': {'debug': False}}, 'hosts': ['a']}
+    source = {'server': {'options': {'timeout': 30}}, 'hosts': ['b']}
+    other_source = {'server': {'options': {'retries': 3}}, 'hosts': ['c']}
+
+    merger = ConfigMerger(MERGE_LIST_APPEND)
+    target = dict(defaults)
+    merger.reset(target)
+    merger.merge(target, source)
+    merger.merge(target, other_source)
+
+    assert target == {'server': {'options': {'debug': False, 'timeout': 30, 'retries': 3}}, 'hosts': ['a', 'b', 'c']}
+    assert defaults == {'server': {'options': {'debug': False}}, 'hosts': ['a']}
+    assert source == {'server': {'options': {'timeout': 30}}, 'hosts': ['b']}
+    assert other_source == {'server': {'options': {'retries': 3}}, 'hosts': ['c']}
+
+
+def test_merge_list_unique_unhashable():
+    merger = ConfigMerger(MERGE_LIST_UNIQUE)
+    target = {'items': [{'a': 1}, 'b']}
+    merger.reset(target)
+    merger.merge(target, {'items': ['b', {'a': 1}, {'a': 2}, {'a': 2}, 'c']})
+    assert target == {'items': [{'a': 1}, 'b', {'a': 2}, 'c']}
+
+
+def test_error_on_unknown_merge_strategy():
+    with pytest.raises(ConfigException):
+        Config(from_string = 'abc: 123\n', merge_strategy = 'unknown')
+
+    with pytest.raises(ConfigException):
+        Config(from_string = 'abc: 123\n', merge_strategy_map = {'abc': 'unknown'})
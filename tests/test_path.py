@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from configmate import Config, ConfigException, ConfigPath, compile_path
+from configmate.path import get_path_value
+
+
+CONFIG_STRING = '''
+name: app
+db:
+  pool:
+    size: 10
+  hosts:
+  - primary
+  - replica
+  title: ${name} db
+'''
+
+
+def test_get_path():
+    config = Config(from_string = CONFIG_STRING)
+    assert config.get_path('name') == 'app'
+    assert config.get_path('db.pool.size') == 10
+    assert config.get_path('db.hosts.1') == 'replica'
+    assert config.get_path('db.title') == 'app db'
+
+
+@pytest.mark.parametrize(
+    'path, missing_path',
+    (
+        ('missing', 'missing'),
+        ('db.missing.size', 'db.missing'),
+        ('db.pool.size.value', 'db.pool.size.value'),
+        ('db.hosts.2', 'db.hosts.2'),
+        ('db.hosts.first', 'db.hosts.first'),
+    )
+)
+def test_get_path_missing(path, missing_path):
+    config = Config(from_string = CONFIG_STRING)
+    assert config.get_path(path, None) is None
+    assert config.get_path(path, default = 5) == 5
+
+    with pytest.raises(KeyError) as exc_info:
+        config.get_path(path)
+
+    assert "'{}' in '{}'".format(missing_path, path) in str(exc_info.value)
+
+
+def test_get_path_empty():
+    config = Config(from_string = CONFIG_STRING)
+    with pytest.raises(ConfigException):
+        config.get_path('')
+
+
+def test_compiled_path():
+    config = Config(from_string = CONFIG_STRING)
+    config_path = compile_path('db.pool.size')
+    assert isinstance(config_path, ConfigPath)
+    assert compile_path('db.pool.size') is config_path
+    assert config_path.name_list == ('db', 'pool', 'size')
+
+    assert config.get_path(config_path) == 10
+    assert config_path(config) == 10
+    assert compile_path('db.pool.missing')(config, 0) == 0
+
+
+def test_get_path_invalidated():
+    config = Config(from_string = CONFIG_STRING)
+    assert config.get_path('db.pool.size') == 10
+    assert config.get_path('db.title') == 'app db'
+
+    config['db'] = {'pool': {'size': 20}, 'title': '${name} database'}
+    assert config.get_path('db.pool.size') == 20
+    assert config.get_path('db.title') == 'app database'
+
+    config['name'] = 'other'
+    assert config.get_path('db.title') == 'other database'
+
+    del config['db']
+    assert config.get_path('db.pool.size', None) is None
+
+
+def test_get_path_none_invalidated():
+    config = Config(from_string = 'a: null\n')
+    assert config.get_path('a') is None
+
+    config['a'] = {'x': 1}
+    assert config.get_path('a') == {'x': 1}
+    assert config.get_path('a.x') == 1
+
+    config['a'] = None
+    assert config.get_path('a') is None
+
+    del config['a']
+    assert config.get_path('a', default = 'D') == 'D'
+
+    with pytest.raises(KeyError):
+        config.get_path('a')
+
+
+def test_get_path_nested_modified():
+    config = Config(from_string = 'db:\n  pool:\n    size: 10\n')
+    assert config.get_path('db.pool.size') == 10
+
+    config['db']['pool']['size'] = 20
+    assert config.get_path('db.pool.size') == 20
+
+
+def test_get_path_value():
+    data = {'db': {'hosts': ['primary', 'replica']}}
+    assert get_path_value(data, 'db.hosts.1') == 'replica'
+    assert get_path_value(data, 'db.port', 5432) == 5432
+
+    with pytest.raises(KeyError) as exc_info:
+        get_path_value(data, 'server.port')
+
+    assert "'server' in 'server.port'" in str(exc_info.value)
+
+    with pytest.raises(ValueError):
+        get_path_value(data, '')
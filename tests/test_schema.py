@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from configmate import Config, ConfigException, ConfigLoadFormatException, Field, Schema, parse_duration, parse_size
+
+
+CONFIG_STRING = '''
+name: app
+port: 8080
+ratio: 1
+timeout: 30s
+cache_size: 512MB
+db:
+  pool:
+    size: 10
+  hosts:
+  - primary
+  - replica
+retry_delays:
+- 100ms
+- 1s
+- ${timeout}
+'''
+
+SCHEMA = {
+    'name': Field(str, required = True, minimum = 1),
+    'port': Field(int, minimum = 1, maximum = 65535),
+    'ratio': float,
+    'timeout': parse_duration,
+    'cache_size': parse_size,
+    'level': Field(str, choices = ('debug', 'info')),
+    'db': Field({'pool': {'size': int}, 'hosts': [str]}, required = True),
+    'retry_delays': [parse_duration],
+}
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    (
+        ('30s', 30.0),
+        ('250ms', 0.25),
+        ('1.5m', 90.0),
+        ('2h', 7200.0),
+        ('1d', 86400.0),
+        (' 10 ', 10.0),
+        (5, 5.0),
+    )
+)
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == expected
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    (
+        ('512MB', 512 * 1024 * 1024),
+        ('1k', 1024),
+        ('2GiB', 2 * 1024 * 1024 * 1024),
+        ('0.5 kb', 512),
+        ('100', 100),
+        (100, 100),
+    )
+)
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+@pytest.mark.parametrize('value', ('', '30x', 's', True, None, [1]))
+def test_parse_invalid(value):
+    with pytest.raises((ValueError, TypeError)):
+        parse_duration(value)
+
+    with pytest.raises((ValueError, TypeError)):
+        parse_size(value)
+
+
+def test_schema_converts_values():
+    config = Config(from_string = CONFIG_STRING, schema = SCHEMA)
+    assert config['timeout'] == 30.0
+    assert config['cache_size'] == 512 * 1024 * 1024
+    assert config['ratio'] == 1.0
+    assert isinstance(config['ratio'], float)
+    assert config['retry_delays'] == [0.1, 1.0, 30.0]
+    assert config['db'] == {'pool': {'size': 10}, 'hosts': ['primary', 'replica']}
+    assert config['name'] == 'app'
+
+
+def test_schema_collects_errors():
+    config_string = '''
+port: 0
+ratio: true
+timeout: soon
+level: verbose
+db:
+  pool:
+    size: ten
+  hosts:
+  - primary
+  - 2
+retry_delays: 1s
+'''
+    with pytest.raises(ConfigLoadFormatException) as exc_info:
+        Config(from_string = config_string, schema = SCHEMA)
+
+    message = str(exc_info.value)
+    for error in (
+        "'name' is required",
+        "'port' must be at least 1",
+        "'ratio' must be a number",
+        "'timeout': Invalid duration: 'soon'",
+        "'level' must be one of debug, info",
+        "'db.pool.size' must be an integer",
+        "'db.hosts.1' must be a string",
+        "'retry_delays' must be a list",
+    ):
+        assert error in message
+
+
+@pytest.mark.parametrize('layered', [False, True])
+def test_schema_converts_expressions(layered):
+    config = Config(
+        from_string = 'base: 30s\nt: ${base}\nport: 80\n',
+        schema = {'t': parse_duration, 'port': int},
+        layered = layered
+    )
+    assert config['t'] == 30.0
+    if layered:
+        assert config.get_key_sources('t') == ['<string>']
+
+    config['base'] = '1m'
+    assert config['t'] == 60.0
+
+    config['port'] = 'http'
+    with pytest.raises(ConfigException) as exc_info:
+        config['port']
+
+    assert "'port' must be an integer" in str(exc_info.value)
+
+
+def test_schema_compile(temp_dir):
+    config = Config(from_string = CONFIG_STRING, schema = SCHEMA)
+    config.compile('config.snapshot')
+    config = Config.from_snapshot('config.snapshot')
+    assert config['timeout'] == 30.0
+
+    config = Config(from_string = CONFIG_STRING, schema = {'timeout': lambda value: parse_duration(value)})
+    with pytest.raises(ConfigException):
+        config.compile('config.snapshot')
+
+
+def test_schema_compiled_once():
+    schema = Schema(SCHEMA)
+    for _ in range(2):
+        config = Config(from_string = CONFIG_STRING, schema = schema)
+        assert config['timeout'] == 30.0
+
+
+def test_invalid_schema():
+    with pytest.raises(ConfigException):
+        Config(from_string = CONFIG_STRING, schema = ['name'])
+
+    with pytest.raises(ConfigException):
+        Config(from_string = CONFIG_STRING, schema = {'name': 'string'})
+
+    with pytest.raises(ConfigException):
+        Config(from_string = CONFIG_STRING, schema = {'hosts': [str, int]})
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pytest
+from configmate import Config, ConfigLoadException, FrozenDict, SharedConfig
+from configmate.shared import get_data_file_name
+
+
+CONFIG_STRING = '''
+name: world
+greeting: hello ${name}
+server:
+  host: localhost
+  ports:
+  - 80
+  - 443
+'''
+
+
+def test_shared(temp_dir):
+    config = Config(from_string = CONFIG_STRING)
+    file_name = os.path.join(temp_dir, 'config.shared')
+    assert config.publish_shared(file_name) == 1
+
+    shared_config = SharedConfig(file_name)
+    assert shared_config.generation == 1
+    assert shared_config.sources == config.sources
+    assert dict(shared_config) == dict(config)
+    assert shared_config['greeting'] == 'hello world'
+    assert isinstance(shared_config['server'], FrozenDict)
+    assert shared_config['server'] is shared_config['server']
+    assert shared_config.get_path('server.ports.1') == 443
+    assert shared_config.get_path('server.missing', default = None) is None
+
+    with pytest.raises(KeyError):
+        shared_config['missing']
+
+    with pytest.raises(KeyError) as exc_info:
+        shared_config.get_path('missing.host')
+
+    assert 'missing' in str(exc_info.value)
+
+    with pytest.raises(TypeError):
+        shared_config['server']['host'] = 'other'
+
+
+def test_shared_refresh(temp_dir):
+    config = Config(from_string = CONFIG_STRING)
+    file_name = os.path.join(temp_dir, 'config.shared')
+    config.publish_shared(file_name)
+    shared_config = SharedConfig(file_name)
+    assert not shared_config.refresh()
+
+    config['name'] = 'everyone'
+    assert config.publish_shared(file_name) == 2
+    assert shared_config['greeting'] == 'hello world'
+    assert shared_config.refresh()
+    assert shared_config.generation == 2
+    assert shared_config['greeting'] == 'hello everyone'
+    assert not os.path.exists(get_data_file_name(file_name, 1))
+
+
+def test_shared_missing(temp_dir):
+    with pytest.raises(ConfigLoadException):
+        SharedConfig(os.path.join(temp_dir, 'missing.shared'))
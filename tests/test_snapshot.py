@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from configmate import Config, ConfigLoadException
+from configmate.cli import compile_snapshot
+from test_from_file import write_file
+import os
+
+
+SNAPSHOT_FILE_NAME = 'config.snapshot'
+
+
+@pytest.fixture()
+def config_files(temp_dir):
+    write_file({'abc': 'easy as', 'def': 123}, file_name = 'base.yml', root_dir = temp_dir, dump_yaml = True)
+
+    return write_file(
+        'def: 456\ninclude:\n- base.yml\ninclude_optional:\n- optional.yml\n',
+        file_name = 'main.yml',
+        root_dir = temp_dir
+    )
+
+
+def test_snapshot(temp_dir, config_files, parse_count):
+    config = Config(from_file = config_files)
+    assert config == {'abc': 'easy as', 'def': 123}
+    assert [file_name for file_name, _ in config.file_list] == [
+        config_files,
+        os.path.join(temp_dir, 'base.yml'),
+        os.path.join(temp_dir, 'optional.yml'),
+    ]
+
+    config.compile(SNAPSHOT_FILE_NAME)
+    parse_count.clear()
+
+    snapshot_config = Config.from_snapshot(SNAPSHOT_FILE_NAME)
+    assert snapshot_config == config
+    assert snapshot_config.sources == config.sources
+    assert not parse_count
+
+
+@pytest.mark.parametrize(
+    'file_name, file_data, expected_config',
+    (
+        ('base.yml', 'abc: changed\n', {'abc': 'changed', 'def': 456}),
+        ('optional.yml', 'ghi: added\n', {'abc': 'easy as', 'def': 123, 'ghi': 'added'}),
+    )
+)
+def test_snapshot_out_of_date(temp_dir, config_files, parse_count, file_name, file_data, expected_config):
+    Config(from_file = config_files).compile(SNAPSHOT_FILE_NAME)
+
+    write_file(file_data, file_name = file_name, root_dir = temp_dir)
+    parse_count.clear()
+
+    config = Config.from_snapshot(SNAPSHOT_FILE_NAME)
+    assert config == expected_config
+    assert parse_count
+
+    # the snapshot has been updated
+    parse_count.clear()
+
+    config = Config.from_snapshot(SNAPSHOT_FILE_NAME)
+    assert config == expected_config
+    assert not parse_count
+
+
+@pytest.mark.parametrize(
+    'snapshot_data',
+    (None, '', 'invalid snapshot')
+)
+def test_error_on_invalid_snapshot(temp_dir, snapshot_data):
+    if snapshot_data is not None:
+        write_file(snapshot_data, file_name = SNAPSHOT_FILE_NAME, root_dir = temp_dir)
+
+    with pytest.raises(ConfigLoadException):
+        Config.from_snapshot(SNAPSHOT_FILE_NAME)
+
+
+def test_compile_snapshot_command(temp_dir, config_files):
+    assert compile_snapshot([config_files, SNAPSHOT_FILE_NAME]) == 0
+    assert Config.from_snapshot(SNAPSHOT_FILE_NAME) == {'abc': 'easy as', 'def': 123}
+
+    assert compile_snapshot(['missing.yml', SNAPSHOT_FILE_NAME]) == 1
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+from configmate import Config, FileDataCache
+from configmate.stats import LoadStats, PHASE_LOAD, PHASE_MERGE, PHASE_PARSE, PHASE_READ, PHASE_RESOLVE, PHASE_VALIDATE
+from test_from_file import write_file
+
+
+def write_config_files(temp_dir):
+    write_file('include:\n- child.yml\nname: main\n', file_name = 'main.yml', root_dir = temp_dir)
+    write_file('include_optional:\n- missing.yml\nport: 8080\n', file_name = 'child.yml', root_dir = temp_dir)
+
+
+def test_not_instrumented(temp_dir):
+    write_config_files(temp_dir)
+    config = Config(from_file = 'main.yml')
+    assert config.load_stats is None
+
+
+def test_load_stats(temp_dir):
+    write_config_files(temp_dir)
+
+    config = Config(from_file = 'main.yml', instrument = True, schema = {'port': int})
+    load_stats = config.load_stats
+    assert isinstance(load_stats, LoadStats)
+    assert config['port'] == 8080
+
+    file_stats_map = {file_stats.name: file_stats for file_stats in load_stats.files}
+    assert set(file_stats_map) == {'main.yml', 'child.yml', 'missing.yml'}
+
+    main_stats = file_stats_map['main.yml']
+    assert set(main_stats.phase_time_map) == {PHASE_PARSE, PHASE_MERGE}
+    assert not main_stats.cached
+    assert main_stats.byte_count == len('include:\n- child.yml\nname: main\n')
+    assert main_stats.depth == 0
+    assert file_stats_map['child.yml'].depth == 1
+    assert not file_stats_map['missing.yml'].found
+    assert set(file_stats_map['missing.yml'].phase_time_map) == {PHASE_RESOLVE}
+
+    for phase in (PHASE_LOAD, PHASE_PARSE, PHASE_VALIDATE):
+        assert load_stats.get_phase_time(phase) > 0
+
+    assert [file_stats.name for file_stats in load_stats.get_slowest_files()] in (
+        ['main.yml', 'child.yml'],
+        ['child.yml', 'main.yml'],
+    )
+    assert load_stats.byte_count == main_stats.byte_count + file_stats_map['child.yml'].byte_count
+    assert load_stats.report().startswith('Config load: ')
+
+
+def test_load_stats_cache_and_reload(temp_dir):
+    write_config_files(temp_dir)
+    cache = FileDataCache()
+
+    Config(from_file = 'main.yml', cache = cache)
+    config = Config(from_file = 'main.yml', cache = cache, instrument = True)
+    assert config.load_stats.cache_hits == 2
+    assert set(config.load_stats.files[0].phase_time_map) == {PHASE_READ, PHASE_MERGE}
+    assert '(cached)' in config.load_stats.report()
+
+    load_stats = config.load_stats
+    config.reload()
+    assert config.load_stats is not load_stats
+    assert config.load_stats.cache_hits == 2
+
+
+def test_load_stats_shared_cache(temp_dir):
+    write_config_files(temp_dir)
+    cache = FileDataCache()
+    load_stats = LoadStats()
+
+    for _ in range(3):
+        Config(from_file = 'main.yml', cache = cache, instrument = load_stats)
+
+    # the first load parses both files, the others read them from the cache
+    assert load_stats.cache_hits == 4
+    assert cache.hits == 4
+
+    write_file('name: main\n', file_name = 'main.yml', root_dir = temp_dir)
+    load_stats = LoadStats()
+    for _ in range(3):
+        Config(from_file = 'main.yml', cache = cache, instrument = load_stats)
+
+    assert load_stats.cache_hits == 2
+
+
+def test_trace_callback(temp_dir):
+    write_config_files(temp_dir)
+
+    span_list = []
+    load_stats = LoadStats(trace_callback = span_list.append)
+    Config(from_file = 'main.yml', instrument = load_stats)
+    Config(from_string = 'abc: 123\n', instrument = load_stats)
+
+    assert [(span.phase, span.name) for span in span_list] == [
+        (PHASE_PARSE, 'main.yml'),
+        (PHASE_MERGE, 'main.yml'),
+        (PHASE_PARSE, 'child.yml'),
+        (PHASE_MERGE, 'child.yml'),
+        (PHASE_RESOLVE, 'missing.yml'),
+        (PHASE_LOAD, None),
+        (PHASE_MERGE, '<string>'),
+        (PHASE_LOAD, None),
+    ]
+    assert span_list[0].attributes == {'byte_count': load_stats.files[0].byte_count, 'cached': False}
+    assert all(span.duration >= 0 for span in span_list)
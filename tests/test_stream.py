@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from configmate import Config, FileDataCache
+from configmate.file_utils import get_yaml_loader_list
+from configmate.stats import PHASE_MERGE, PHASE_PARSE
+from configmate.stream import read_yaml_file_streamed, StreamedList
+from test_from_file import write_file
+
+
+INVENTORY_DATA = '''
+name: inventory
+hosts:
+- name: web1
+  port: &port 8080
+- {name: web2, port: *port}
+- [db1, 5432]
+empty: []
+tags: tag
+'''
+
+HOST_LIST = [{'name': 'web1', 'port': 8080}, {'name': 'web2', 'port': 8080}, ['db1', 5432]]
+
+
+@pytest.mark.parametrize(
+    'yaml_loader',
+    get_yaml_loader_list(),
+    ids = [loader.__name__ for loader in get_yaml_loader_list()]
+)
+def test_read_yaml_file_streamed(temp_dir, yaml_loader):
+    file_name = write_file(INVENTORY_DATA, root_dir = temp_dir)
+
+    config_data = read_yaml_file_streamed(file_name, {'hosts', 'empty', 'tags'}, yaml_loader = yaml_loader)
+    assert config_data['name'] == 'inventory'
+    assert config_data['tags'] == 'tag'
+    assert isinstance(config_data['hosts'], StreamedList)
+    assert list(config_data['hosts']) == HOST_LIST
+    assert list(config_data['hosts']) == HOST_LIST
+    assert len(config_data['hosts']) == 3
+    assert list(config_data['empty']) == []
+    assert {key: value for key, value in config_data.items() if key not in ('hosts', 'empty')} == {
+        'name': 'inventory',
+        'tags': 'tag',
+    }
+
+
+@pytest.mark.parametrize('file_data, expected', (('', None), ('- 1\n', [1]), ('abc\n', 'abc')))
+def test_read_yaml_file_streamed_not_mapping(temp_dir, file_data, expected):
+    file_name = write_file(file_data, root_dir = temp_dir)
+    assert read_yaml_file_streamed(file_name, {'hosts'}) == expected
+
+
+def test_config_stream_keys(temp_dir):
+    write_file(INVENTORY_DATA, file_name = 'inventory.yml', root_dir = temp_dir)
+    write_file('include:\n- inventory.yml\nname: main\n', file_name = 'main.yml', root_dir = temp_dir)
+
+    config = Config(from_file = 'main.yml', stream_keys = ['hosts'])
+    assert config['name'] == 'inventory'
+    assert isinstance(config['hosts'], StreamedList)
+    assert list(config['hosts']) == HOST_LIST
+
+    config = Config(from_file = 'main.yml')
+    assert config['hosts'] == HOST_LIST
+
+
+def test_config_stream_keys_reload(temp_dir):
+    file_name = write_file(INVENTORY_DATA, file_name = 'inventory.yml', root_dir = temp_dir)
+    config = Config(from_file = 'inventory.yml', stream_keys = ['hosts'])
+    assert config.reload() == set()
+
+    write_file(INVENTORY_DATA + 'other: 1\n', file_name = file_name)
+    assert config.reload() == {'hosts', 'other'}
+
+
+def test_config_stream_keys_cache(temp_dir):
+    write_file(INVENTORY_DATA, file_name = 'inventory.yml', root_dir = temp_dir)
+    cache = FileDataCache()
+
+    # the same file is cached separately with and without streaming
+    for _ in range(2):
+        config = Config(from_file = 'inventory.yml', cache = cache, stream_keys = ['hosts'])
+        assert isinstance(config['hosts'], StreamedList)
+
+        config = Config(from_file = 'inventory.yml', cache = cache)
+        assert config['hosts'] == HOST_LIST
+
+    assert len(cache) == 2
+    assert cache.hits == 2
+
+
+def test_config_stream_keys_load_stats(temp_dir):
+    write_file(INVENTORY_DATA, file_name = 'inventory.yml', root_dir = temp_dir)
+
+    config = Config(from_file = 'inventory.yml', stream_keys = ['hosts'], instrument = True)
+    file_stats = config.load_stats.files[0]
+    assert set(file_stats.phase_time_map) == {PHASE_PARSE, PHASE_MERGE}
+    assert file_stats.byte_count == len(INVENTORY_DATA)
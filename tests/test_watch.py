@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from configmate import Config, ConfigWatcher
+from test_from_file import write_file
+import threading
+
+
+@pytest.fixture()
+def config_files(temp_dir):
+    write_file('abc: easy as\ndef: 123\n', file_name = 'base.yml', root_dir = temp_dir)
+    write_file('ghi: unchanged\n', file_name = 'other.yml', root_dir = temp_dir)
+
+    return write_file('include:\n- base.yml\n- other.yml\n', file_name = 'main.yml', root_dir = temp_dir)
+
+
+def test_reload(temp_dir, config_files, parse_count):
+    config = Config(from_file = config_files)
+    config['jkl'] = 'runtime'
+    assert config.changed_file_list == []
+    assert config.reload() == {'jkl'}
+
+    write_file('abc: changed\nmno: added\n', file_name = 'base.yml', root_dir = temp_dir)
+    assert config.changed_file_list == ['{}/base.yml'.format(temp_dir)]
+
+    parse_count.clear()
+    assert config.reload() == {'abc', 'def', 'mno'}
+    assert config == {'abc': 'changed', 'ghi': 'unchanged', 'mno': 'added'}
+    assert config.changed_file_list == []
+    assert list(parse_count.keys()) == ['base.yml']
+
+
+def test_watcher_check(temp_dir, config_files):
+    config = Config(from_file = config_files)
+    watcher = ConfigWatcher(config)
+
+    notification_list = []
+    watcher.subscribe(lambda config, changed_key_set: notification_list.append(changed_key_set))
+
+    assert watcher.check() == set()
+
+    write_file('abc: easy as\ndef: 123\n', file_name = 'base.yml', root_dir = temp_dir)
+    write_file('ghi: changed\n', file_name = 'other.yml', root_dir = temp_dir)
+    assert watcher.check() == {'ghi'}
+    assert notification_list == [{'ghi'}]
+
+    # invalid data keeps the current values
+    write_file('- invalid\n', file_name = 'other.yml', root_dir = temp_dir)
+    assert watcher.check() == set()
+    assert config['ghi'] == 'changed'
+
+    write_file('ghi: fixed\n', file_name = 'other.yml', root_dir = temp_dir)
+    assert watcher.check() == {'ghi'}
+    assert notification_list == [{'ghi'}, {'ghi'}]
+
+
+def test_watcher_thread(temp_dir, config_files):
+    config = Config(from_file = config_files)
+    watcher = ConfigWatcher(config, interval = 0.01)
+
+    reloaded = threading.Event()
+    watcher.subscribe(lambda config, changed_key_set: reloaded.set())
+
+    watcher.start()
+    assert watcher.running
+
+    try:
+        write_file('ghi: changed\n', file_name = 'other.yml', root_dir = temp_dir)
+        assert reloaded.wait(5)
+        assert config['ghi'] == 'changed'
+
+    finally:
+        watcher.stop()
+
+    assert not watcher.running
+
+
+def test_reload_threads(temp_dir):
+    config_file_name = write_file('abc: a\nref: ${abc}\n', file_name = 'main.yml', root_dir = temp_dir)
+    config = Config(from_file = config_file_name)
+    stop_event = threading.Event()
+
+    def read():
+        while not stop_event.is_set():
+            config['ref']
+
+    thread_list = [threading.Thread(target = read) for _ in range(4)]
+    for thread in thread_list:
+        thread.start()
+
+    try:
+        for index in range(2, 30):
+            write_file('abc: {}\nref: ${{abc}}\n'.format('a' * index), file_name = 'main.yml', root_dir = temp_dir)
+            config.reload()
+
+    finally:
+        stop_event.set()
+        for thread in thread_list:
+            thread.join()
+
+    # values expanded from the previous load are never cached for the new one
+    assert config['ref'] == 'a' * 29